@@ -0,0 +1,302 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+""" Scaling benchmark of SGA, ECGA and hBOA on concatenated trap
+    functions. Each run is performed in a separate worker process,
+    results are written as JSON lines and can be compared against a
+    stored baseline.
+"""
+
+from __future__ import print_function
+import os
+import sys
+import json
+import resource
+from time import perf_counter
+from argparse import ArgumentParser
+from multiprocessing import Pool
+from pga import PGA_OLDPOP
+from .instrument import Instrumentation
+from . import deceptive
+
+# Parameters identifying a benchmark configuration (without the seed)
+config_keys = ('cls', 'trap_size', 'ntraps', 'shuffle', 'popsize')
+# Timings compared against a baseline
+timing_keys = ('time_build_model', 'time_sample_model')
+
+def quiet () :
+    """ Pool initializer: The GA prints its progress to stdout (also
+        from C code), redirect the file descriptor to /dev/null.
+    """
+    devnull = os.open (os.devnull, os.O_WRONLY)
+    os.dup2 (devnull, 1)
+    sys.stdout = open (os.devnull, 'w')
+# end def quiet
+
+def run_deceptive (params) :
+    """ Run one optimization of trap functions with the given params
+        (a dict with the config_keys, seed and maxiter, optionally
+        further keyword arguments for the Dec_ classes in 'kw').
+        Returns params updated with the results of the run, if
+        params has a true 'trace' entry the result contains the
+        per-generation records as a list of dicts in 'trace'.
+    """
+    cls   = getattr (deceptive, 'Dec_' + params ['cls'])
+    fun   = ((params ['trap_size'], params ['ntraps']),)
+    instr = Instrumentation ()
+    start = perf_counter ()
+    d = cls \
+        ( fun
+        , shuffle         = params ['shuffle']
+        , popsize         = params ['popsize']
+        , random_seed     = params ['seed']
+        , maxiter         = params ['maxiter']
+        , instrumentation = instr
+        , ** params.get ('kw', {})
+        )
+    d.run ()
+    result  = dict (params)
+    best    = d.get_best_index (PGA_OLDPOP)
+    success = d.evaluate (best, PGA_OLDPOP, count_eval = False) >= d.maxeval
+    result.update \
+        ( success     = bool (success)
+        , evaluations = d.eval_counter
+        , generations = d.get_iteration ()
+        , time_total  = perf_counter () - start
+        , peak_rss_kb = resource.getrusage (resource.RUSAGE_SELF).ru_maxrss
+        )
+    for k in ('extract', 'build_model', 'sample_model', 'evaluate') :
+        result ['time_' + k] = sum \
+            (g.timings.get (k, 0.0) for g in instr.generations)
+    if params.get ('trace') :
+        result ['trace'] = [g.as_dict () for g in instr.generations]
+    d.close ()
+    return result
+# end def run_deceptive
+
+def run_parallel (function, params, jobs = None) :
+    """ Run function for each of params in worker processes. Each
+        worker performs a single run so that the peak memory reported
+        is that of the run. Results are yielded in order of params.
+    """
+    with Pool (jobs, initializer = quiet, maxtasksperchild = 1) as pool :
+        for r in pool.imap (function, params) :
+            yield r
+# end def run_parallel
+
+def sweep \
+    ( classes, trap_size, ntraps, shuffles, popsizes, seeds, maxiter
+    , ** kw
+    ) :
+    """ Parameters for all combinations of the given settings
+    """
+    for cls in classes :
+        for nt in ntraps :
+            for shuffle in shuffles :
+                for popsize in popsizes :
+                    for seed in seeds :
+                        p = dict \
+                            ( cls       = cls
+                            , trap_size = trap_size
+                            , ntraps    = nt
+                            , shuffle   = shuffle
+                            , popsize   = popsize
+                            , seed      = seed
+                            , maxiter   = maxiter
+                            )
+                        if kw :
+                            p ['kw'] = kw
+                        yield p
+# end def sweep
+
+def aggregate (results) :
+    """ Aggregate results over seeds, returns a dict indexed by the
+        configuration with the mean timings per generation of a run,
+        success rate and mean evaluations of successful runs. Timings
+        are per generation because runs converging faster also spend
+        less time in total.
+    """
+    agg = {}
+    for r in results :
+        key = tuple (r [k] for k in config_keys)
+        if key not in agg :
+            agg [key] = dict (runs = 0, success = 0, evaluations = 0)
+            for k in timing_keys :
+                agg [key][k] = 0.0
+        a = agg [key]
+        a ['runs'] += 1
+        for k in timing_keys :
+            a [k] += r [k] / max (r ['generations'], 1)
+        if r ['success'] :
+            a ['success']     += 1
+            a ['evaluations'] += r ['evaluations']
+    for a in agg.values () :
+        for k in timing_keys :
+            a [k] /= a ['runs']
+        if a ['success'] :
+            a ['evaluations'] /= a ['success']
+    return agg
+# end def aggregate
+
+def compare (results, baseline, tolerance = 1.25, file = sys.stdout) :
+    """ Compare results to baseline results, report configurations
+        where model building or sampling per generation got slower by
+        more than the tolerance factor or the success rate dropped. Returns the
+        number of regressions found.
+    """
+    new = aggregate (results)
+    old = aggregate (baseline)
+    regressions = 0
+    for key in sorted (new, key = str) :
+        if key not in old :
+            continue
+        n, o = new [key], old [key]
+        msgs = []
+        for k in timing_keys :
+            if o [k] > 0 and n [k] > o [k] * tolerance :
+                msgs.append \
+                    ("%s %.4fs -> %.4fs per generation" % (k, o [k], n [k]))
+        if n ['success'] * o ['runs'] < o ['success'] * n ['runs'] :
+            msgs.append \
+                ( "success %d/%d -> %d/%d"
+                % (o ['success'], o ['runs'], n ['success'], n ['runs'])
+                )
+        if msgs :
+            regressions += 1
+            cfg = ', '.join ('%s=%s' % kv for kv in zip (config_keys, key))
+            print ("REGRESSION %s: %s" % (cfg, '; '.join (msgs)), file = file)
+    return regressions
+# end def compare
+
+def read_results (filename) :
+    with open (filename) as f :
+        return [json.loads (line) for line in f if line.strip ()]
+# end def read_results
+
+def main (argv = None) :
+    cmd = ArgumentParser ()
+    cmd.add_argument \
+        ( '-b', '--baseline'
+        , help    = "Compare results to this baseline file (JSON lines)"
+        )
+    cmd.add_argument \
+        ( '-c', '--class'
+        , dest    = 'classes'
+        , help    = "Class to benchmark, one of SGA, ECGA, HBOA, "
+                    "can be given several times, default: ECGA and HBOA"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-j', '--jobs'
+        , type    = int
+        , help    = "Number of parallel runs, default: number of CPUs"
+        )
+    cmd.add_argument \
+        ( '-k', '--trap-size'
+        , type    = int
+        , help    = "Number of bits of a trap function, default=%(default)s"
+        , default = 5
+        )
+    cmd.add_argument \
+        ( '-m', '--maxiter'
+        , type    = int
+        , help    = "Maximum number of generations, default=%(default)s"
+        , default = 200
+        )
+    cmd.add_argument \
+        ( '-n', '--ntraps'
+        , type    = int
+        , help    = "Number of trap functions, can be given several times, "
+                    "default: 4 and 8"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-o', '--output'
+        , help    = "Output file for results (JSON lines), default: stdout"
+        )
+    cmd.add_argument \
+        ( '-p', '--popsize'
+        , type    = int
+        , help    = "Population size, can be given several times, "
+                    "default: 500"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-S', '--seeds'
+        , type    = int
+        , help    = "Number of random seeds (1..n) per configuration, "
+                    "default=%(default)s"
+        , default = 3
+        )
+    cmd.add_argument \
+        ( '-s', '--shuffle'
+        , help    = "Shuffled (yes), unshuffled (no) or both, "
+                    "default=%(default)s"
+        , choices = ('yes', 'no', 'both')
+        , default = 'both'
+        )
+    cmd.add_argument \
+        ( '-t', '--tolerance'
+        , type    = float
+        , help    = "Factor by which timings may exceed the baseline, "
+                    "default=%(default)s"
+        , default = 1.25
+        )
+    args     = cmd.parse_args (argv)
+    shuffles = dict \
+        (yes = (True,), no = (False,), both = (False, True)) [args.shuffle]
+    params = sweep \
+        ( args.classes or ['ECGA', 'HBOA']
+        , args.trap_size
+        , args.ntraps  or [4, 8]
+        , shuffles
+        , args.popsize or [500]
+        , range (1, args.seeds + 1)
+        , args.maxiter
+        )
+    out = sys.stdout
+    if args.output :
+        out = open (args.output, 'w')
+    results = []
+    for r in run_parallel (run_deceptive, list (params), args.jobs) :
+        results.append (r)
+        print (json.dumps (r, sort_keys = True), file = out)
+        out.flush ()
+    if args.output :
+        out.close ()
+    if args.baseline :
+        baseline = read_results (args.baseline)
+        if compare (results, baseline, args.tolerance, file = sys.stderr) :
+            sys.exit (1)
+# end def main
+
+if __name__ == '__main__' :
+    main ()
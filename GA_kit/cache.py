@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+""" Least recently used caches with a memory budget
+"""
+
+from collections      import OrderedDict
+from rsclib.autosuper import autosuper
+
+class LRU_Cache (autosuper) :
+    """ LRU cache with a memory budget: The memory used by each entry
+        is estimated by size and the least recently used entries are
+        evicted when the total exceeds budget bytes, a budget of 0
+        means unlimited.
+    """
+    # Estimated size of an entry
+    entry_bytes = 200
+
+    def __init__ (self, budget = 0) :
+        self.budget = budget
+        self.clear ()
+    # end def __init__
+
+    def __contains__ (self, key) :
+        return key in self.entries
+    # end def __contains__
+
+    def __len__ (self) :
+        return len (self.entries)
+    # end def __len__
+
+    def clear (self) :
+        self.entries   = OrderedDict ()
+        self.nbytes    = 0
+        self.peak      = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+    # end def clear
+
+    def discard (self, key) :
+        if key in self.entries :
+            self.nbytes -= self.size (key, self.entries.pop (key))
+    # end def discard
+
+    def get (self, key) :
+        """ Cached value or None
+        """
+        if key in self.entries :
+            self.hits += 1
+            self.entries.move_to_end (key)
+            return self.entries [key]
+        self.misses += 1
+        return None
+    # end def get
+
+    def hit_rate (self) :
+        n = self.hits + self.misses
+        if not n :
+            return 0.0
+        return self.hits / n
+    # end def hit_rate
+
+    def put (self, key, value) :
+        self.discard (key)
+        self.entries [key] = value
+        self.nbytes += self.size (key, value)
+        while self.budget and self.nbytes > self.budget and self.entries :
+            k, v = self.entries.popitem (last = False)
+            self.nbytes -= self.size (k, v)
+            self.evictions += 1
+        self.peak = max (self.peak, self.nbytes)
+    # end def put
+
+    def size (self, key, value) :
+        return self.entry_bytes
+    # end def size
+
+# end class LRU_Cache
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+""" Checkpoint files: A pickled dictionary with the state of a run,
+    the population is stored bit-packed.
+"""
+
+import os
+import pickle
+import numpy as np
+
+def load_checkpoint (filename) :
+    """ Load a checkpoint, the population is returned unpacked as a
+        uint8 matrix with one row per individual.
+    """
+    with open (filename, 'rb') as f :
+        state = pickle.load (f)
+    state ['population'] = np.unpackbits \
+        (state ['population'], axis = 1, count = state ['length'])
+    return state
+# end def load_checkpoint
+
+def save_checkpoint (filename, state) :
+    """ Save checkpoint state, the population (a uint8 matrix) is
+        packed into bits. The file is written under a temporary name
+        and then renamed, so an interrupted write never destroys the
+        previous checkpoint.
+    """
+    state = dict (state)
+    state ['length']     = state ['population'].shape [1]
+    state ['population'] = np.packbits (state ['population'], axis = 1)
+    tmp = filename + '.tmp'
+    with open (tmp, 'wb') as f :
+        pickle.dump (state, f, pickle.HIGHEST_PROTOCOL)
+    os.replace (tmp, filename)
+# end def save_checkpoint
@@ -29,6 +29,8 @@
 # ****************************************************************************
 
 from __future__ import print_function
+import sys
+import numpy as np
 from pga import PGA, PGA_STOP_MAXITER, PGA_REPORT_STRING, PGA_POPREPL_RTR
 from pga import PGA_OLDPOP
 from rsclib.autosuper import autosuper
@@ -36,6 +38,36 @@ from argparse import ArgumentParser
 from .sga  import SGA
 from .ecga import ECGA
 from .hboa import HBOA
+from .evaluator import Pool_Evaluator
+from .instrument import Instrumentation
+from .metrics    import Metrics_Sink
+from .problems   import make_problem, problem_classes
+
+class Trap_Function (object) :
+    """ Vectorized concatenated trap functions: For each trap length
+        gather the bits of all trap functions into a (individual,
+        function, bit) array and sum the trap values of each row.
+        This is a module-level class so that it can be pickled and
+        sent to the worker processes of a Pool_Evaluator.
+    """
+
+    def __init__ (self, funidx) :
+        # Index arrays of trap functions grouped by length
+        self.funarr = []
+        for l in sorted (set (len (idxes) for idxes in funidx)) :
+            a = [idxes for idxes in funidx if len (idxes) == l]
+            self.funarr.append ((l, np.array (a)))
+    # end def __init__
+
+    def __call__ (self, m) :
+        eval = np.zeros (len (m))
+        for l, idx in self.funarr :
+            v = m [:, idx].sum (axis = 2)
+            eval += np.where (v == 0, l, v - 1.0).sum (axis = 1)
+        return eval
+    # end def __call__
+
+# end class Trap_Function
 
 class Deceptive (autosuper) :
 
@@ -52,8 +84,28 @@ class Deceptive (autosuper) :
         , s_penalty       = 2.0
         , min_split       = 0
         , max_parent      = 0
+        , jobs            = 0
+        , instrumentation = None
+        , checkpoint      = None
+        , checkpoint_interval = 0
+        , resume          = None
+        , funidx          = None
+        , warm_start      = False
+        , rebuild_interval = 10
+        , cache_budget    = 0
+        , score_jobs      = 0
+        , surrogate_fraction = 1.0
+        , problem         = None
+        , fitness_cache   = 0
+        , quiet           = False
         ) :
         self.fun             = fun
+        self.problem         = problem
+        self.warm_start      = warm_start
+        self.rebuild_interval = rebuild_interval
+        self.cache_budget    = cache_budget
+        self.score_jobs      = score_jobs
+        self.surrogate_fraction = surrogate_fraction
         self.shuffle         = shuffle
         self.s_penalty       = s_penalty
         self.min_split       = min_split
@@ -62,6 +114,8 @@ class Deceptive (autosuper) :
         length  = 0
         for k, n in self.fun :
             length += k * n
+        if problem is not None :
+            length = problem.length
         self.__super.__init__ \
             ( length
             , maximize            = True
@@ -75,23 +129,36 @@ class Deceptive (autosuper) :
             , max_GA_iter         = maxiter
             , tournament_size     = tournament_size
             , rtr_window_size     = rtr_window_size
+            , instrumentation     = instrumentation
+            , checkpoint          = checkpoint
+            , checkpoint_interval = checkpoint_interval
+            , resume              = resume
+            , fitness_cache       = fitness_cache
+            , quiet               = quiet
             )
 
         indexes = list (range (len (self)))
         self.funidx = []
-        if self.shuffle :
+        if self.shuffle and funidx is None :
             l = len (self)
             for k in range (l) :
                 j = self.random_interval (0, l - 1)
                 indexes [k], indexes [j] = indexes [j], indexes [k]
         idx = 0
-        for bits, nfunc in self.fun :
+        # A library problem defines its own structure
+        fun = self.fun if problem is None else ()
+        for bits, nfunc in fun :
             for n in range (nfunc) :
                 a = []
                 self.funidx.append (a)
                 for b in range (bits) :
                     a.append (indexes [idx])
                     idx += 1
+        # Explicitly given gene indexes of the trap functions
+        if funidx is not None :
+            self.funidx = [list (a) for a in funidx]
+        if problem is not None :
+            self.funidx = []
         print ("Optimizing:")
         print ("Random seed:     %s" % random_seed)
         print ("Population size: %s" % popsize)
@@ -100,21 +167,47 @@ class Deceptive (autosuper) :
         if isinstance (self, HBOA) :
             print ("HBOA S-Penalty:  %s" % s_penalty)
             print ("HBOA Min-Split:  %s" % min_split)
-        print ("Functions:", self.funidx)
+        if isinstance (self, ECGA) and warm_start :
+            print ("ECGA Warm-Start: rebuild every %s" % rebuild_interval)
+        if surrogate_fraction < 1 :
+            print ("Surrogate fraction: %s" % surrogate_fraction)
+        if problem is None :
+            print ("Functions:", self.funidx)
+            self.trap = Trap_Function (self.funidx)
+        else :
+            print ("Problem:         %s" % problem)
+            if problem.optimum is None :
+                print \
+                    ( "Warning: Optimum unknown, running until maxiter"
+                    , file = sys.stderr
+                    )
+            self.trap = problem
+        if jobs :
+            self.evaluator = Pool_Evaluator (self.trap, max_workers = jobs)
         self.maxeval = 0.0
         for idxes in self.funidx :
             self.maxeval += len (idxes)
+        if problem is not None :
+            self.maxeval = problem.optimum
+            if self.maxeval is None :
+                self.maxeval = np.inf
+            # Optima of real-valued problems may be summed differently
+            self.maxeval -= 1e-9
     # end def __init__
 
     def stop_cond (self) :
         best = self.get_best_index (PGA_OLDPOP)
-        eval = self.evaluate (best, PGA_OLDPOP, count_eval = False)
-        if eval >= self.maxeval :
+        if self.true_evaluation (best, PGA_OLDPOP) >= self.maxeval :
             return True
         return self.check_stopping_conditions ()
     # end def stop_cond
 
     def evaluate (self, p, pop, count_eval = True) :
+        if self.problem is not None :
+            if count_eval :
+                self.eval_counter += 1
+            m = self.get_population_matrix (pop, [p])
+            return float (self.problem (m) [0])
         eval = 0.0
         for indexes in self.funidx :
             l = len (indexes)
@@ -132,6 +225,10 @@ class Deceptive (autosuper) :
         return eval
     # end def evaluate
 
+    def evaluate_batch (self, m) :
+        return self.trap (m)
+    # end def evaluate_batch
+
 # end class Deceptive
 
 class Dec_SGA (Deceptive, SGA) :
@@ -152,11 +249,48 @@ def main () :
         , help    = "Class to use, one of %s, default=%%(default)s" % (classes,)
         , default = 'SGA'
         )
+    cmd.add_argument \
+        ( '--cache-budget'
+        , type    = int
+        , help    = "Memory budget of the ECGA partition cache in MB, "
+                    "0 for unlimited, default=%(default)s"
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '--checkpoint'
+        , help    = "Save the state of the run to this file"
+        )
+    cmd.add_argument \
+        ( '--checkpoint-interval'
+        , type    = int
+        , help    = "Save a checkpoint every N generations, "
+                    "default=%(default)s"
+        , default = 10
+        )
     cmd.add_argument \
         ( '-d', '--deceptive-function'
         , help    = "Add deceptive function with length/count"
         , action  = "append"
         )
+    cmd.add_argument \
+        ( '--fitness-cache'
+        , type    = int
+        , help    = "Memory budget of the cache of evaluations by genome "
+                    "in MB, 0 disables the cache, default=%(default)s"
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '-i', '--instrument'
+        , help    = "Collect per-generation timings and print a summary"
+        , action  = "store_true"
+        )
+    cmd.add_argument \
+        ( '-j', '--jobs'
+        , type    = int
+        , help    = "Number of processes for parallel evaluation, "
+                    "default: %(default)s (serial evaluation)"
+        , default = 0
+        )
     cmd.add_argument \
         ( '-m', '--maxiter'
         , type    = int
@@ -170,6 +304,11 @@ def main () :
                     "default:%(default)s, only used for HBOA"
         , default = 0
         )
+    cmd.add_argument \
+        ( '--metrics'
+        , help    = "Write metrics of each generation to this file, "
+                    "as CSV if it ends in .csv, otherwise as JSON lines"
+        )
     cmd.add_argument \
         ( '--min-split'
         , type    = int
@@ -183,6 +322,23 @@ def main () :
         , help    = "Population size, default=%(default)s"
         , default = 1000
         )
+    cmd.add_argument \
+        ( '-q', '--quiet'
+        , help    = "Do not print progress and model in each generation"
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--rebuild-interval'
+        , type    = int
+        , help    = "With --warm-start rebuild the ECGA model from scratch "
+                    "every N generations, 0 for never, default=%(default)s"
+        , default = 10
+        )
+    cmd.add_argument \
+        ( '--resume'
+        , help    = "Resume from the given checkpoint file, the other "
+                    "options must be the same as for the original run"
+        )
     cmd.add_argument \
         ( '--rtr-window-size'
         , type    = int
@@ -196,6 +352,22 @@ def main () :
                     "only used for HBOA"
         , default = 0.0
         )
+    cmd.add_argument \
+        ( '--score-jobs'
+        , type    = int
+        , help    = "Number of worker processes for scoring model "
+                    "candidates (ECGA merges, HBOA splits), "
+                    "default=%(default)s"
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '--surrogate-fraction'
+        , type    = float
+        , help    = "Fraction of the children of ECGA or HBOA evaluated, "
+                    "the others get a fitness estimated from the model, "
+                    "default=%(default)s"
+        , default = 1.0
+        )
     cmd.add_argument \
         ( '--tournament-size'
         , type    = int
@@ -203,11 +375,24 @@ def main () :
                     "default= %(default)s"
         , default = 2
         )
+    cmd.add_argument \
+        ( '-w', '--warm-start'
+        , help    = "Seed ECGA model building with the partitions of the "
+                    "previous generation"
+        , action  = "store_true"
+        )
     cmd.add_argument \
         ( '-s', '--shuffle'
         , help    = "Shuffle genes of deceptive functions"
         , action  = "store_true"
         )
+    cmd.add_argument \
+        ( '-P', '--problem'
+        , help    = "Benchmark problem instead of deceptive functions, "
+                    "NAME[:key=value,...] with NAME one of %s, e.g., "
+                    "nk:n=100,k=4,seed=1 (see problems.py)"
+                  % ', '.join (sorted (problem_classes))
+        )
     cmd.add_argument \
         ( '-R', '--random-seed'
         , type    = int
@@ -224,6 +409,18 @@ def main () :
         deceptive_function = ((5, 20),)
 
     cls = globals () ['Dec_' + args.cls]
+    problem = None
+    if args.problem :
+        problem = make_problem (args.problem)
+    instrumentation = None
+    if args.instrument :
+        instrumentation = Instrumentation ()
+    sink = None
+    if args.metrics :
+        sink = Metrics_Sink (args.metrics)
+        if instrumentation is None :
+            instrumentation = Instrumentation (keep = False)
+        instrumentation.callback = sink
     if not args.s_penalty :
         args.s_penalty = float (args.tournament_size)
 
@@ -238,8 +435,26 @@ def main () :
         , s_penalty       = args.s_penalty
         , min_split       = args.min_split
         , max_parent      = args.max_parent
+        , jobs            = args.jobs
+        , instrumentation = instrumentation
+        , checkpoint      = args.checkpoint
+        , checkpoint_interval = args.checkpoint_interval
+        , resume          = args.resume
+        , warm_start      = args.warm_start
+        , rebuild_interval = args.rebuild_interval
+        , cache_budget    = args.cache_budget * 1024 * 1024
+        , score_jobs      = args.score_jobs
+        , surrogate_fraction = args.surrogate_fraction
+        , problem         = problem
+        , fitness_cache   = args.fitness_cache * 1024 * 1024
+        , quiet           = args.quiet
         )
     d.run ()
+    d.close ()
+    if sink :
+        sink.close ()
+    if args.instrument :
+        instrumentation.summary (sys.stdout)
 # end def main
 
 if __name__ == '__main__' :
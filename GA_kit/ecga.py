@@ -29,63 +29,231 @@
 # ****************************************************************************
 
 from __future__ import print_function
+import numpy as np
+from heapq import heappush, heappop
+from itertools import repeat
 from math import log
 from .sga import PMBGA, log2
+from .cache import LRU_Cache
+from .shared import attach
 
 def pkey (partition) :
     return (-len (partition), partition [0])
 
+def count_entropy (counts, n) :
+    """ Entropy of a distribution given by counts in a population of
+        size n, multiplied by n, i.e., the bits needed to encode the
+        partition in all individuals.
+    """
+    p = counts / n
+    return float (-(p * np.log2 (p)).sum ()) * n
+# end def count_entropy
+
+def decode (codes, k) :
+    """ Inverse of encode: The bits of the given codes as a matrix
+        with k columns, the first column is the most significant bit.
+    """
+    shift = np.arange (k - 1, -1, -1)
+    return ((codes [:, None] >> shift) & 1).astype (np.uint8)
+# end def decode
+
+def encode (genes, partitions) :
+    """ Encode the columns of each partition of the bit matrix genes
+        into integer codes. All partitions must have the same size k,
+        the lowest column index of a partition is the most significant
+        bit. So the numeric order of the codes is the sorted order of
+        the bit tuples. Returns a matrix with one column per partition.
+    """
+    k = len (partitions [0])
+    assert k < 63
+    cols = np.array ([sorted (p) for p in partitions])
+    w    = np.left_shift (1, np.arange (k - 1, -1, -1, dtype = np.int64))
+    return genes [:, cols] @ w
+# end def encode
+
+def partition_counts (genes, partitions) :
+    """ Count the occurrences of the codes of each partition (all of
+        the same size). For small partitions the codes of all
+        partitions are offset so that a single bincount does the
+        counting, for large partitions (where most of the 2**k codes
+        cannot occur) we fall back to np.unique. Returns a list of
+        tuples (codes, counts) with sorted codes that do occur.
+    """
+    k     = len (partitions [0])
+    n     = len (partitions)
+    size  = 1 << k
+    codes = encode (genes, partitions)
+    if size > len (genes) :
+        return [np.unique (codes [:, j], return_counts = True)
+                for j in range (n)
+               ]
+    codes  = codes + np.arange (n, dtype = np.int64) * size
+    counts = np.bincount (codes.ravel (), minlength = n * size)
+    result = []
+    for row in counts.reshape (n, size) :
+        nz = np.flatnonzero (row)
+        result.append ((nz, row [nz]))
+    return result
+# end def partition_counts
+
+def code_dtype (k) :
+    """ Smallest unsigned type that holds codes of k bits
+    """
+    for dt in (np.uint8, np.uint16, np.uint32) :
+        if k <= 8 * np.dtype (dt).itemsize :
+            return dt
+    return np.uint64
+# end def code_dtype
+
+def score_partitions (name, shape, partitions, log2n1) :
+    """ Worker process part of parallel scoring: MDL scores of the
+        given partitions (all of the same size) of the gene matrix in
+        the Shared_Matrix with the given name.
+    """
+    genes = attach (name, shape)
+    size  = (2.0 ** len (partitions [0]) - 1.0) * log2n1
+    return \
+        [ count_entropy (counts, shape [0]) + size
+          for codes, counts in partition_counts (genes, partitions)
+        ]
+# end def score_partitions
+
+class Partition_Cache (LRU_Cache) :
+    """ LRU cache of MDL scores of partitions. Optionally the
+        distribution of a partition is kept as compact arrays of the
+        codes that occur and their counts. Entries are tuples of MDL
+        score, codes, and counts.
+    """
+    # Estimated size of an entry without arrays and key elements
+    entry_bytes = 200
+
+    def distribution (self, partition) :
+        """ Tuple of MDL score, codes, and counts or None if the
+            distribution is not cached
+        """
+        entry = self.entries.get (partition)
+        if entry is not None and entry [1] is not None :
+            return self.get (partition)
+        self.misses += 1
+        return None
+    # end def distribution
+
+    def mpm (self, partition) :
+        """ Cached MDL score or None
+        """
+        entry = self.get (partition)
+        if entry is None :
+            return None
+        return entry [0]
+    # end def mpm
+
+    def put (self, partition, mpm, codes = None, counts = None) :
+        if codes is not None :
+            codes  = codes.astype (code_dtype (len (partition)))
+            counts = counts.astype (np.uint32)
+        self.__super.put (partition, (mpm, codes, counts))
+    # end def put
+
+    def size (self, partition, entry) :
+        n = self.entry_bytes + 8 * len (partition)
+        if entry [1] is not None :
+            n += entry [1].nbytes + entry [2].nbytes
+        return n
+    # end def size
+
+# end class Partition_Cache
+
 class ECGA (PMBGA) :
     """ Extended Compacat Genetic Algorithm
     """
+    # Maximum number of gene matrix elements gathered per counting call
+    count_chunk = 1 << 24
+    # Seed model building with the partitions of the last generation,
+    # do a full rebuild from singletons every rebuild_interval builds
+    warm_start       = False
+    rebuild_interval = 10
+    # Memory budget of the partition cache in bytes, 0 is unlimited
+    cache_budget     = 0
+    # Candidates are scored in the worker pool (see score_jobs in
+    # PMBGA) only when scoring at least score_min partitions at once.
+    score_min        = 64
+
+    def add_candidate (self, c1, c2) :
+        """ Score the merge of partitions c1 and c2, candidates with
+            a positive gain are pushed onto the heap of merge gains.
+            The heap is ordered by negative gain and key, i.e., the
+            largest gain is popped first and among equal gains the
+            smallest key, the same order a scan over the sorted
+            candidates would produce.
+        """
+        c = c1 + c2
+        if not self.may_gain (c1, c2) :
+            return
+        d = self.mpm (c1) + self.mpm (c2) - self.mpm (c)
+        if d > 0 :
+            self.candidates [c] = [c1, c2]
+            self.by_part.setdefault (c1, []).append (c)
+            self.by_part.setdefault (c2, []).append (c)
+            heappush (self.heap, (-d, c))
+        else :
+            self.delete (c)
+    # end def add_candidate
 
     def build_model (self, p_pop) :
+        """ Greedy MDL merging of partitions: Always merge the
+            candidate pair with the largest gain. Gains of candidates
+            never change, so we keep them in a heap. Candidates
+            involving a merged partition become stale, they are
+            removed from self.candidates (found via self.by_part) and
+            skipped when popped from the heap. After a merge only the
+            candidates of the new partition need to be scored.
+            The merging starts from the partitions returned by
+            initial_partitions.
+        """
         self.__super.build_model (p_pop)
-        self.partitions = dict (((i,), 1) for i in range (len (self)))
+        self.nmerge     = 0
+        self.nscored    = 0
+        self.nsplit     = 0
+        self.partitions = self.initial_partitions ()
         self.candidates = {}
+        self.by_part    = {}
+        self.heap       = []
+        self.score (list (self.partitions))
+        pairs = []
         for part1 in sorted (self.partitions) :
             for part2 in sorted (self.partitions) :
                 if part1 == part2 :
                     continue
-                self.candidates [part1 + part2] = [part1, part2]
-        while self.candidates :
-            m = 0
-            k = None
-            keys = tuple (self.candidates.keys ())
-            for c in sorted (keys) :
-                c1, c2 = self.candidates [c]
-                d = self.mpm (c1) + self.mpm (c2) - self.mpm (c)
-                if d > 0 :
-                    if d > m :
-                        m = d
-                        k = c
-                else :
-                    self.delete (c)
-            if k :
-                c1, c2 = self.candidates [k]
-                self.delete (c1)
-                self.delete (c2)
-                keys = tuple (self.candidates.keys ())
-                for c in keys :
-                    if c1 in self.candidates [c] or c2 in self.candidates [c] :
-                        self.delete (c)
-                for p in sorted (self.partitions) :
-                    self.candidates [p + k] = [p, k]
-                self.partitions [k] = 1
-            else :
-                assert not self.candidates
+                pairs.append ((part1, part2))
+        self.score_pairs (pairs)
+        for part1, part2 in pairs :
+            self.add_candidate (part1, part2)
+        while self.heap :
+            d, k = heappop (self.heap)
+            if k not in self.candidates :
+                continue
+            c1, c2 = self.candidates [k]
+            for c in self.by_part.pop (c1) + self.by_part.pop (c2) :
+                self.delete (c)
+            self.delete (c1)
+            self.delete (c2)
+            pairs = [(p, k) for p in sorted (self.partitions)]
+            self.score_pairs (pairs)
+            for p, k in pairs :
+                self.add_candidate (p, k)
+            self.partitions [k] = 1
+            self.nmerge += 1
+        self.heap    = []
+        self.by_part = {}
+        self.nbuild += 1
     # end def build_model
 
     def clear_cache (self) :
-        self._mpm_cache    = {}
-        self._probab_cache = {}
+        self.cache.clear ()
     # end def clear_cache
 
     def delete (self, partition) :
-        if partition in self._mpm_cache :
-            del self._mpm_cache [partition]
-        if partition in self._probab_cache :
-            del self._probab_cache [partition]
+        self.cache.discard (partition)
         if partition in self.candidates :
             del self.candidates [partition]
         if partition in self.partitions :
@@ -93,57 +261,230 @@ class ECGA (PMBGA) :
     # end def delete
 
     def entropy (self, partition) :
-        d = {}
-        for g in self.genes :
-            key = []
-            for k in sorted (partition) :
-                key.append (g [k])
-            key = tuple (key)
-            if key not in d :
-                d [key] = 0.0
-            d [key] += 1
-        l = len (self.genes)
-        p = []
-        for k in sorted (d) :
-            d [k] = d [k] / l
-            p.append (d [k])
-        self._probab_cache [partition] = d
-        return sum (-pk * log2 (pk) for pk in p) * len (self.genes)
+        return self.mpm (partition) - self.repr_size (partition)
     # end def entropy
 
+    def initial_partitions (self) :
+        """ All singletons unless we do a warm start: Then the
+            partitions of the last model are verified against the
+            current population, genes that no longer pay for being
+            part of their partition are split off as singletons.
+        """
+        singletons = dict (((i,), 1) for i in range (len (self)))
+        last       = getattr (self, 'partitions', None)
+        if  (  not self.warm_start
+            or not last
+            or (   self.rebuild_interval
+               and self.nbuild % self.rebuild_interval == 0
+               )
+            ) :
+            return singletons
+        self.score (list (singletons) + list (last))
+        partitions = {}
+        for part in sorted (last) :
+            for i in self.split (part) :
+                partitions [i] = 1
+        return partitions
+    # end def initial_partitions
+
+    def may_gain (self, c1, c2) :
+        """ The entropy term is never negative, so if the model size
+            of the merged partition alone is at least the combined
+            score of c1 and c2 the merge cannot have a positive gain
+            and we need not count it at all.
+        """
+        b = self.mpm (c1) + self.mpm (c2)
+        return self.repr_size (c1 + c2) < b
+    # end def may_gain
+
+    def model_state (self) :
+        """ The partitions and the number of models built, so a warm
+            start continues with the same rebuild schedule.
+        """
+        return dict \
+            ( partitions = sorted (getattr (self, 'partitions', ()))
+            , nbuild     = self.nbuild
+            )
+    # end def model_state
+
+    def model_stats (self) :
+        return dict \
+            ( merges            = self.nmerge
+            , candidates_scored = self.nscored
+            , partitions        = len (self.partitions)
+            , splits            = self.nsplit
+            , cache_hit_rate    = self.cache.hit_rate ()
+            , cache_bytes       = self.cache.nbytes
+            , cache_peak_bytes  = self.cache.peak
+            , cache_evictions   = self.cache.evictions
+            )
+    # end def model_stats
+
     def mpm (self, partition) :
-        if partition not in self._mpm_cache :
-            e = self.entropy   (partition)
-            s = self.repr_size (partition)
-            self._mpm_cache [partition] = e + s
-        return self._mpm_cache [partition]
+        mpm = self.cache.mpm (partition)
+        if mpm is None :
+            mpm = self.score ([partition]) [0][0]
+        return mpm
     # end def mpm
 
     def repr_size (self, partition) :
         return (2.0 ** len (partition) - 1.0) * self.log2n1
     # end def repr_size
 
-    def sample_individual (self, p, pop) :
-        for part in sorted (self.partitions) :
-            r = self.random01 ()
-            psum = 0.0
-            for k in sorted (self._probab_cache [part].keys ()) :
-                psum += self._probab_cache [part][k]
-                if psum >= r :
-                    for idx, bit in zip (part, k) :
-                        self.set_allele (p, pop, idx, bit)
-                    break
+    def split (self, part) :
+        """ Split off the gene whose removal improves the MDL score
+            most until no removal improves it. Returns the remaining
+            partition and the genes split off as singletons.
+        """
+        result = []
+        while len (part) > 1 :
+            rest = [tuple (x for x in part if x != i) for i in part]
+            self.score (rest)
+            d, j = max \
+                ( (self.mpm (part) - self.mpm (r) - self.mpm ((i,)), j)
+                  for j, (i, r) in enumerate (zip (part, rest))
+                )
+            if d <= 0 :
+                break
+            result.append ((part [j],))
+            part = rest [j]
+            self.nsplit += 1
+        result.append (part)
+        return result
+    # end def split
+
+    def sample_population (self, n) :
+        """ Sample n individuals in one vectorized pass.
+            The distribution of each partition is turned into a
+            cumulative distribution, the CDF of partition j is shifted
+            by j so that all CDFs form one sorted array. A matrix of
+            uniform random numbers (shifted the same way) is then
+            looked up with a single searchsorted.
+        """
+        parts    = sorted (self.partitions)
+        children = np.zeros ((n, len (self)), dtype = np.uint8)
+        cdfs     = []
+        keys     = []
+        offsets  = []
+        offset   = 0
+        dists    = [self.cache.distribution (p) for p in parts]
+        missing  = [p for p, d in zip (parts, dists) if d is None]
+        computed = dict (zip (missing, self.score (missing, keep = True)))
+        for j, part in enumerate (parts) :
+            codes, counts = (dists [j] or computed [part]) [1:]
+            cdf = np.cumsum (counts / len (self.genes))
+            cdf [-1] = 1.0
+            cdfs.append (cdf + j)
+            keys.append (decode (codes.astype (np.int64), len (part)))
+            offsets.append (offset)
+            offset += len (codes)
+        u   = self.rng.random ((n, len (parts))) + np.arange (len (parts))
+        idx = np.searchsorted (np.concatenate (cdfs), u, side = 'right')
+        idx -= np.array (offsets)
+        for j, part in enumerate (parts) :
+            # Keys are in sorted order of the partition indexes
+            children [:, sorted (part)] = keys [j][idx [:, j]]
+        return children
+    # end def sample_population
+
+    def score (self, partitions, keep = False) :
+        """ Compute MDL score of all given partitions that are not yet
+            cached, with keep also their distribution. Partitions
+            consisting of the same indexes (in different order) are
+            computed only once, partitions of the same size are
+            counted together in chunks of at most count_chunk gathered
+            matrix elements. Only distributions asked for with keep
+            (those of the final partitions) are retained in the cache.
+            Returns a tuple (mpm, codes, counts) per partition.
+        """
+        l       = len (self.genes)
+        todo    = {}
+        by_size = {}
+        result  = {}
+        for part in partitions :
+            if keep :
+                d = self.cache.distribution (part)
+                if d is not None :
+                    result [part] = d
+                    continue
             else :
-                assert False
-        #self.print_string (self.file, p, c_pop)
-    # end def sample_model
+                mpm = self.cache.mpm (part)
+                if mpm is not None :
+                    result [part] = (mpm, None, None)
+                    continue
+            todo.setdefault (tuple (sorted (part)), []).append (part)
+        for s in todo :
+            by_size.setdefault (len (s), []).append (s)
+        parallel = \
+            (   self.score_pool is not None
+            and not keep
+            and len (todo) >= self.score_min
+            )
+        chunks = []
+        for k in sorted (by_size) :
+            parts = by_size [k]
+            step  = max (1, self.count_chunk // (l * k))
+            if parallel :
+                step = min (step, -(-len (parts) // (4 * self.score_jobs)))
+            for i in range (0, len (parts), step) :
+                chunks.append (parts [i:i+step])
+        if parallel :
+            # Results are returned in order of the chunks, so the
+            # cache and the greedy merge order are the same as for
+            # serial scoring.
+            counted = \
+                ( [(mpm, None, None) for mpm in r]
+                  for r in self.score_pool.map
+                    ( score_partitions
+                    , repeat (self.shared.name)
+                    , repeat (self.shared.shape)
+                    , chunks
+                    , repeat (self.log2n1)
+                    )
+                )
+        else :
+            counted = \
+                ( [ (count_entropy (c, l) + self.repr_size (chunk [0]), d, c)
+                    for d, c in partition_counts (self.genes, chunk)
+                  ]
+                  for chunk in chunks
+                )
+        for chunk, r in zip (chunks, counted) :
+            for s, (mpm, codes, counts) in zip (chunk, r) :
+                for part in todo [s] :
+                    result [part] = (mpm, codes, counts)
+                    if keep :
+                        self.cache.put (part, mpm, codes, counts)
+                    else :
+                        self.cache.put (part, mpm)
+                self.nscored += 1
+        return [result [part] for part in partitions]
+    # end def score
+
+    def score_pairs (self, pairs) :
+        """ Score the merged partitions of all pairs that may gain
+        """
+        self.score ([c1 + c2 for c1, c2 in pairs if self.may_gain (c1, c2)])
+    # end def score_pairs
+
+    def surrogate_features (self, m) :
+        return [encode (m, [part]) [:, 0] for part in sorted (self.partitions)]
+    # end def surrogate_features
 
     def post_init (self) :
         self.__super.post_init ()
         self.log2n1  = log2 (len (self) + 1)
+        self.nbuild  = 0
+        self.cache   = Partition_Cache (self.cache_budget)
         self.clear_cache ()
     # end def post_init
 
+    def restore_model (self, model) :
+        self.partitions = dict.fromkeys \
+            ((tuple (p) for p in model ['partitions']), 1)
+        self.nbuild     = model ['nbuild']
+    # end def restore_model
+
     def print_model (self) :
         for part in sorted (self.partitions, key = pkey) :
             print (list (part), end = ' ', file = self.file)
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from rsclib.autosuper   import autosuper
+
+class Serial_Evaluator (autosuper) :
+    """ Evaluation backend for SGA: Evaluate a matrix of individuals
+        (one row per individual) with the given function which must
+        return a vector of evaluations.
+    """
+
+    def __init__ (self, function) :
+        self.function = function
+    # end def __init__
+
+    def close (self) :
+        pass
+    # end def close
+
+    def evaluate (self, m) :
+        return np.asarray (self.function (m), dtype = float)
+    # end def evaluate
+
+# end class Serial_Evaluator
+
+class Pool_Evaluator (Serial_Evaluator) :
+    """ Evaluate in a process pool: The matrix is split into chunks of
+        rows that are evaluated by the worker processes, results are
+        returned in the order of the rows. The function must be
+        picklable, e.g., a module-level function or an instance of a
+        module-level class. Since the function only sees the matrix
+        the results are identical to a serial evaluation.
+    """
+
+    def __init__ (self, function, max_workers = None, chunksize = 0) :
+        self.__super.__init__ (function)
+        self.workers   = max_workers or os.cpu_count () or 1
+        self.executor  = ProcessPoolExecutor (self.workers)
+        self.chunksize = chunksize
+    # end def __init__
+
+    def close (self) :
+        self.executor.shutdown ()
+    # end def close
+
+    def evaluate (self, m) :
+        cs = self.chunksize
+        if not cs :
+            cs = max (1, -(-len (m) // (4 * self.workers)))
+        chunks = [m [i:i + cs] for i in range (0, len (m), cs)]
+        r = self.executor.map (self.function, chunks)
+        return np.concatenate ([np.asarray (e, dtype = float) for e in r])
+    # end def evaluate
+
+# end class Pool_Evaluator
+
+class Rowwise_Function (object) :
+    """ Turn a function evaluating a single individual (a vector of
+        bits) into a function evaluating a matrix of individuals.
+    """
+
+    def __init__ (self, function) :
+        self.function = function
+    # end def __init__
+
+    def __call__ (self, m) :
+        return [self.function (row) for row in m]
+    # end def __call__
+
+# end class Rowwise_Function
@@ -0,0 +1,320 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+""" Run a grid of experiments in parallel and keep the results in a
+    SQLite database. Each cell of the grid is one run of a Dec_ class
+    identified by its parameters, cells already in the database are
+    skipped when the grid is run again.
+"""
+
+from __future__ import print_function
+import sys
+import json
+import sqlite3
+from argparse import ArgumentParser
+from itertools import product
+from math import sqrt
+from .benchmark import run_deceptive, run_parallel
+
+# Parameters of the Dec_ classes passed as keyword arguments, they
+# only influence HBOA, other classes always get the defaults
+kw_params   = ('s_penalty', 'min_split', 'max_parent')
+kw_defaults = dict (s_penalty = 2.0, min_split = 0, max_parent = 0)
+
+schema = \
+    ( """create table if not exists run
+           ( key    text primary key
+           , config text not null
+           , seed   integer not null
+           , result text not null
+           )
+      """
+    , """create table if not exists generation
+           ( key        text not null
+           , generation integer not null
+           , record     text not null
+           , primary key (key, generation)
+           )
+      """
+    )
+
+def config_of (params) :
+    """ The configuration of a run: all parameters except the seed
+    """
+    return dict ((k, v) for k, v in params.items () if k != 'seed')
+# end def config_of
+
+def param_of (config, name) :
+    """ Parameter with the given name of a configuration, the
+        kw_params are nested in the kw entry.
+    """
+    if name in kw_params :
+        return config.get ('kw', {}).get (name)
+    return config.get (name)
+# end def param_of
+
+def key_of (params) :
+    return json.dumps (params, sort_keys = True)
+# end def key_of
+
+class Result_Store (object) :
+    """ SQLite store for per-run summaries and per-generation traces
+    """
+
+    def __init__ (self, filename) :
+        self.db = sqlite3.connect (filename)
+        for s in schema :
+            self.db.execute (s)
+        self.db.commit ()
+    # end def __init__
+
+    def close (self) :
+        self.db.close ()
+    # end def close
+
+    def done (self) :
+        """ Keys of all finished runs
+        """
+        return set (r [0] for r in self.db.execute ("select key from run"))
+    # end def done
+
+    def insert (self, params, result) :
+        key   = key_of (params)
+        trace = result.pop ('trace', [])
+        self.db.execute \
+            ( "insert or replace into run values (?, ?, ?, ?)"
+            , (key, key_of (config_of (params)), params ['seed'],
+               json.dumps (result, sort_keys = True))
+            )
+        self.db.executemany \
+            ( "insert or replace into generation values (?, ?, ?)"
+            , ( (key, g ['generation'], json.dumps (g, sort_keys = True))
+                for g in trace
+              )
+            )
+        self.db.commit ()
+    # end def insert
+
+    def results (self) :
+        """ Iterate over (config, result) of all runs
+        """
+        for c, r in self.db.execute ("select config, result from run") :
+            yield json.loads (c), json.loads (r)
+    # end def results
+
+    def statistics (self, by = None) :
+        """ Aggregate runs grouped by configuration (or by the given
+            parameter names). Returns a list of (group, stats) with
+            number of runs, success rate and mean and standard
+            deviation of evaluations of successful runs, mean number
+            of generations and mean model build and sampling time.
+        """
+        groups = {}
+        for config, r in self.results () :
+            if by :
+                config = dict ((k, param_of (config, k)) for k in by)
+            groups.setdefault (key_of (config), []).append (r)
+        stats = []
+        for g in sorted (groups) :
+            runs = groups [g]
+            ok   = [r ['evaluations'] for r in runs if r ['success']]
+            n    = len (runs)
+            s    = dict \
+                ( runs              = n
+                , success_rate      = len (ok) / n
+                , generations       = sum (r ['generations'] for r in runs) / n
+                , time_build_model  = sum
+                    (r ['time_build_model'] for r in runs) / n
+                , time_sample_model = sum
+                    (r ['time_sample_model'] for r in runs) / n
+                , evaluations       = None
+                , evaluations_sd    = None
+                )
+            if ok :
+                mean = sum (ok) / len (ok)
+                s ['evaluations']    = mean
+                s ['evaluations_sd'] = sqrt \
+                    (sum ((e - mean) ** 2 for e in ok) / len (ok))
+            stats.append ((json.loads (g), s))
+        return stats
+    # end def statistics
+
+# end class Result_Store
+
+def grid (args) :
+    """ All cells of the grid given by the command-line arguments,
+        the kw_params are only varied for HBOA.
+    """
+    classes = args.classes or ['ECGA']
+    funs    = args.deceptive_function or ['5/4']
+    hboa_kw = \
+        [ dict (zip (kw_params, v))
+          for v in product
+            ( args.s_penalty  or [kw_defaults ['s_penalty']]
+            , args.min_split  or [kw_defaults ['min_split']]
+            , args.max_parent or [kw_defaults ['max_parent']]
+            )
+        ]
+    axes    = \
+        ( classes
+        , funs
+        , args.shuffle or [False]
+        , args.popsize or [500]
+        )
+    for cls, fun, shuffle, popsize in product (* axes) :
+        trap_size, ntraps = (int (i) for i in fun.split ('/'))
+        kws = hboa_kw if cls == 'HBOA' else [kw_defaults]
+        for kw, seed in product (kws, range (1, args.seeds + 1)) :
+            yield dict \
+                ( cls       = cls
+                , trap_size = trap_size
+                , ntraps    = ntraps
+                , shuffle   = shuffle
+                , popsize   = popsize
+                , seed      = seed
+                , maxiter   = args.maxiter
+                , kw        = dict (kw)
+                )
+# end def grid
+
+def run_grid (store, cells, jobs = None, file = sys.stdout) :
+    """ Run all cells not yet in the store, the results are stored as
+        they arrive.
+    """
+    done  = store.done ()
+    todo  = [dict (c, trace = True) for c in cells if key_of (c) not in done]
+    print ("Running %d cells" % len (todo), file = file)
+    for r in run_parallel (run_deceptive, todo, jobs) :
+        params = dict ((k, r [k]) for k in todo [0] if k != 'trace')
+        store.insert (params, r)
+        print \
+            ( "%s seed=%s popsize=%s success=%s evaluations=%s"
+            % (r ['cls'], r ['seed'], r ['popsize'], r ['success'],
+               r ['evaluations'])
+            , file = file
+            )
+# end def run_grid
+
+def main (argv = None) :
+    cmd = ArgumentParser ()
+    cmd.add_argument \
+        ( 'command'
+        , help    = "run: run the grid, stats: print aggregated statistics"
+        , choices = ('run', 'stats')
+        )
+    cmd.add_argument \
+        ( '-b', '--by'
+        , help    = "Comma-separated parameters to group statistics by, "
+                    "default: full configuration"
+        )
+    cmd.add_argument \
+        ( '-c', '--class'
+        , dest    = 'classes'
+        , help    = "Class to use, one of SGA, ECGA, HBOA, "
+                    "can be given several times"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-d', '--deceptive-function'
+        , help    = "Deceptive function with length/count, "
+                    "can be given several times"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-D', '--database'
+        , help    = "SQLite database for results, default=%(default)s"
+        , default = 'ga-kit-grid.sqlite'
+        )
+    cmd.add_argument \
+        ( '-j', '--jobs'
+        , type    = int
+        , help    = "Number of parallel runs, default: number of CPUs"
+        )
+    cmd.add_argument \
+        ( '-m', '--maxiter'
+        , type    = int
+        , help    = "Maximum number of generations, default=%(default)s"
+        , default = 200
+        )
+    cmd.add_argument \
+        ( '--max-parent'
+        , type    = int
+        , help    = "HBOA maximum number of parents, can be given "
+                    "several times"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '--min-split'
+        , type    = int
+        , help    = "HBOA minimum split, can be given several times"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-p', '--popsize'
+        , type    = int
+        , help    = "Population size, can be given several times"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-S', '--seeds'
+        , type    = int
+        , help    = "Number of random seeds (1..n), default=%(default)s"
+        , default = 5
+        )
+    cmd.add_argument \
+        ( '--s-penalty'
+        , type    = float
+        , help    = "HBOA s-penalty, can be given several times"
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '-s', '--shuffle'
+        , help    = "Run shuffled and unshuffled trap functions"
+        , action  = 'store_const'
+        , const   = [False, True]
+        )
+    args  = cmd.parse_args (argv)
+    store = Result_Store (args.database)
+    if args.command == 'run' :
+        run_grid (store, grid (args), args.jobs)
+    else :
+        by = None
+        if args.by :
+            by = args.by.split (',')
+        for group, s in store.statistics (by) :
+            print (json.dumps (group, sort_keys = True))
+            for k in sorted (s) :
+                print ("    %-18s %s" % (k, s [k]))
+    store.close ()
+# end def main
+
+if __name__ == '__main__' :
+    main ()
@@ -28,9 +28,88 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # ****************************************************************************
 
-from sys  import stderr
+import numpy as np
+from heapq import heapify, heappush, heappop
+from itertools import repeat
+from sys  import stderr, getsizeof
 from math import log, lgamma
 from .sga import PMBGA, log2
+from .shared import attach
+
+try :
+    popcount = int.bit_count
+except AttributeError :
+    def popcount (x) :
+        return bin (x).count ('1')
+    # end def popcount
+
+def bits (x) :
+    """ Indexes of the bits set in x
+    """
+    while x :
+        low = x & -x
+        yield low.bit_length () - 1
+        x ^= low
+# end def bits
+
+def column_bitsets (genes) :
+    """ Each column of the bit matrix genes as a python int, bit r of
+        the int is the gene of row r. Sets of rows (the samples in a
+        decision tree leaf) are represented the same way, so the
+        number of ones of a column in a set of rows is the popcount
+        of the AND of the column and the set.
+    """
+    packed = np.packbits (genes.T, axis = 1, bitorder = 'little')
+    return [int.from_bytes (row.tobytes (), 'little') for row in packed]
+# end def column_bitsets
+
+def leaf_index (m, var, child) :
+    """ Index of the leaf of a flat decision tree (see BNode.flat_tree)
+        for each row of m. All rows walk down the tree together: The
+        tree index of each row starts at the root and is replaced by
+        the child selected by the split gene until all rows reach a
+        leaf.
+    """
+    n     = len (m)
+    t     = np.zeros (n, dtype = np.intp)
+    inner = np.arange (n) if var [0] >= 0 else t [:0]
+    while len (inner) :
+        k         = t [inner]
+        t [inner] = child [k, m [inner, var [k]]]
+        inner     = inner [var [t [inner]] >= 0]
+    return t
+# end def leaf_index
+
+def leaf_score (n, n1, lgamma = lgamma) :
+    """ BD score of a leaf with n samples, n1 of them ones
+    """
+    score = 0.0
+    score += lgamma (1 + n1)
+    score += lgamma (1 + n - n1)
+    score -= lgamma (2 + n)
+    return score
+# end def leaf_score
+
+def split_gains (name, shape, rows, idx, score, cols, cutoff) :
+    """ Worker process part of parallel split scoring: Gains of
+        splitting the leaf of gene idx with the given rows (None for
+        all) and score on each gene in the range cols of the gene
+        matrix in the Shared_Matrix with the given name.
+    """
+    genes = attach (name, shape)
+    if rows is not None :
+        genes = genes [rows]
+    n    = len (genes)
+    ones = genes [:, idx].astype (bool)
+    m    = genes [:, cols [0]:cols [1]]
+    o1   = int (np.count_nonzero (ones))
+    n_1  = m.sum (axis = 0, dtype = np.int64).tolist ()
+    n11  = m [ones].sum (axis = 0, dtype = np.int64).tolist ()
+    return \
+        [ leaf_score (n - a, o1 - b) + leaf_score (a, b) - score - cutoff
+          for a, b in zip (n_1, n11)
+        ]
+# end def split_gains
 
 class Bayesian_Network (object) :
 
@@ -47,6 +126,8 @@ class Bayesian_Network (object) :
         self.nodecount = len (genes [0])
         self.n         = len (genes)
         self.genes     = genes
+        self.columns   = column_bitsets (genes)
+        self.all       = (1 << self.n) - 1
         self.nodes     = {}
         self.roots     = {}
         self.cutoff    = log2 (self.n) / 2.0 * s_penalty
@@ -55,45 +136,65 @@ class Bayesian_Network (object) :
         self.lgamma    = lgamma
         self.maxparent = max_parent
         self.min_split = min_split
+        # Statistics of model building
+        self.nsplit      = 0
+        self.ncandidates = 0
+        self.nfeasible   = 0
+        # Number of candidate records currently stored and maximum
+        self.nlive       = 0
+        self.peak        = 0
+        # Estimated bytes of the column and leaf bitsets, candidate
+        # records and precomputed gains currently stored and maximum
+        self.cand_bytes  = getsizeof (Candidate (None, None, 0.0))
+        self.nbytes      = 0
+        self.peak_bytes  = 0
+        self.account (sum (getsizeof (c) for c in self.columns))
+        self.by_idx    = []
         for bitidx in range (self.nodecount) :
             node = BNode (self, bitidx)
             self.nodes [node] = 1
             self.roots [node] = 1
+            self.by_idx.append (node)
         # The initial candidates already need the full list of nodes
+        self.split_gains ([n.dnode for n in self.nodes])
         for n in self.nodes :
             n.add_initial_candidates ()
-        nsplit = 0
-        while 1 :
-            maxgain = -1
-            leave   = None
-            cidx    = -1
-            for node in self.nodes :
-                for l in node.leaves () :
-                    for c in l.candidate_iter () :
-                        if c.feasible () :
-                            if c.gain > maxgain :
-                                maxgain = c.gain
-                                leave   = l
-                                cidx    = c.idx
-                            # Since candidates are returned best-first
-                            # we can stop after the first found
-                            break
-                        else :
-                            l.del_candidate (c)
-            if maxgain <= 0 :
-                break
+            n.dnode.drop_gains ()
+        # Global priority queue of candidate splits, ordered by gain
+        # and then by node, position of the leaf in the decision tree
+        # and order of candidates in the leaf. This is the order in
+        # which a scan over all leaves would find the best split.
+        # Entries of leaves that were split are stale, infeasible
+        # candidates never become feasible again, both are dropped
+        # when popped.
+        self.heap = []
+        self.seq  = 0
+        for n in self.nodes :
+            self.push_candidates (n.dnode)
+        while self.heap :
+            g, idx, path, seq, leave, c = heappop (self.heap)
+            if leave.candidates.get (c.idx) is not c :
+                continue
+            if not c.feasible () :
+                leave.del_candidate (c)
+                continue
+            self.nsplit += 1
+            dnode = leave.split (c.idx)
             if self.verbose :
-                print ("maxgain: %2.2f" % maxgain, end = ' ')
+                print ("maxgain: %2.2f" % c.gain, end = ' ')
                 print \
                     ( "%4.2f -> %4.2f %4.2f"
                     % ( leave.score
-                      , leave.candidates [cidx].children [0].score
-                      , leave.candidates [cidx].children [1].score
+                      , dnode.children [0].score
+                      , dnode.children [1].score
                       )
                     )
-            nsplit += 1
-            leave.split (cidx)
-        print ("nsplit: %s" % nsplit)
+            for l in dnode.children :
+                self.push_candidates (l)
+        self.heap  = []
+        self.order = None
+        if not hboa.quiet :
+            print ("nsplit: %s" % self.nsplit)
     # end def __init__
 
     def debug (self, *args, **kw) :
@@ -101,29 +202,114 @@ class Bayesian_Network (object) :
             print (*args, **kw, file = stderr)
     # end def debug
 
-    def _sample_node (self, node, d) :
-        dn = node.dnode
-        while not isinstance (dn, DLeaf) :
-            dn = dn.children [d [dn.idx]]
-        assert dn.idx == node.idx
-        bit = self.hboa.random_flip (dn.p)
-        d [dn.idx] = bit
-        for c in node.children :
-            if c.idx in d :
-                continue
-            for parent in c.parents :
-                if parent.idx not in d :
-                    break
-            else :
-                self._sample_node (c, d)
-    # end def _sample_node
+    def push_candidates (self, leaf) :
+        for c in leaf.candidate_iter () :
+            heappush \
+                (self.heap, (-c.gain, leaf.idx, leaf.path, self.seq, leaf, c))
+            self.seq += 1
+    # end def push_candidates
+
+    def compile (self) :
+        """ Compile the network for sampling: A list of the nodes in
+            topological order (parents before children, ties broken
+            by index), each with its decision tree as flat arrays.
+        """
+        indegree = dict ((n, len (n.parents)) for n in self.nodes)
+        ready    = [n.idx for n in self.nodes if not indegree [n]]
+        heapify (ready)
+        self.order = []
+        while ready :
+            node = self.by_idx [heappop (ready)]
+            self.order.append ((node.idx,) + node.flat_tree ())
+            for c in node.children :
+                indegree [c] -= 1
+                if not indegree [c] :
+                    heappush (ready, c.idx)
+        assert len (self.order) == self.nodecount
+    # end def compile
+
+    def rows (self, mask) :
+        """ Row indexes of a bitset of rows
+        """
+        b = np.frombuffer \
+            (mask.to_bytes ((self.n + 7) // 8, 'little'), dtype = np.uint8)
+        return np.flatnonzero (np.unpackbits (b, bitorder = 'little'))
+    # end def rows
+
+    def sample_population (self, n, rng) :
+        """ Sample n individuals column by column in topological
+            order, the split genes of a column are already sampled
+            when we determine the leaves of its decision tree.
+        """
+        if self.order is None :
+            self.compile ()
+        m = np.zeros ((n, self.nodecount), dtype = np.uint8)
+        for idx, var, child, p in self.order :
+            t = leaf_index (m, var, child)
+            m [:, idx] = rng.random (n) < p [t]
+        return m
+    # end def sample_population
+
+    def contexts (self, m) :
+        """ For each node the leaf of its decision tree and the value
+            of its gene, encoded as 2 * leaf + bit, for all rows of m
+        """
+        if self.order is None :
+            self.compile ()
+        return \
+            [ 2 * leaf_index (m, var, child) + m [:, idx]
+              for idx, var, child, p in self.order
+            ]
+    # end def contexts
 
-    def sample_model (self) :
-        d = {}
-        for r in self.roots :
-            self._sample_node (r, d)
-        return d
-    # end def sample_model
+    def account (self, nbytes) :
+        """ Add nbytes to the estimated memory in use
+        """
+        self.nbytes    += nbytes
+        self.peak_bytes = max (self.peak_bytes, self.nbytes)
+    # end def account
+
+    def split_gains (self, leaves) :
+        """ With a worker pool precompute the gains of splitting the
+            given leaves on each gene. Leaves get a list of gains
+            indexed by gene, see DLeaf.try_add_candidate. Each leaf
+            is scored in score_jobs chunks of genes, only leaves with
+            at least split_min elements (rows times genes) are worth
+            sending to the pool. Gains are computed from the same
+            counts in the same order as in the parent process, so the
+            network is identical to a serial build.
+        """
+        hboa = self.hboa
+        if hboa.score_pool is None :
+            return
+        l      = self.nodecount
+        leaves = [x for x in leaves if x.n * l >= hboa.split_min]
+        if not leaves :
+            return
+        step  = -(-l // hboa.score_jobs)
+        tasks = []
+        for leaf in leaves :
+            rows = None
+            if leaf.mask != self.all :
+                rows = self.rows (leaf.mask)
+            leaf.gains = [None] * l
+            # List and float objects
+            self.account (getsizeof (leaf.gains) + 24 * l)
+            for lo in range (0, l, step) :
+                tasks.append ((leaf, rows, (lo, min (lo + step, l))))
+        gains = hboa.score_pool.map \
+            ( split_gains
+            , repeat (hboa.shared.name)
+            , repeat (hboa.shared.shape)
+            , [t [1] for t in tasks]
+            , [t [0].idx for t in tasks]
+            , [t [0].score for t in tasks]
+            , [t [2] for t in tasks]
+            , repeat (self.cutoff)
+            )
+        for (leaf, rows, (lo, hi)), g in zip (tasks, gains) :
+            leaf.gains [lo:hi] = g
+    # end def split_gains
 
 # end class Bayesian_Network
 
@@ -133,12 +319,15 @@ class BNode (object) :
         self.net      = net
         self.debug    = net.debug
         self.verbose  = net.verbose
-        self.genes    = net.genes
+        self.mask     = net.all
         self.idx      = idx
         self.parents  = {}
         self.children = {}
         self.lvl      = 0
-        self.dnode    = DLeaf (self, self, 0, self.genes)
+        self.dnode    = DLeaf (self, self, 0, self.mask)
+        # Bitsets of the indexes of all ancestors and descendants
+        self.anc      = 0
+        self.desc     = 0
         self.rank     = 0
     # end def __init__
 
@@ -155,41 +344,50 @@ class BNode (object) :
         assert self not in node.parents
         self.parents  [node] = 1
         node.children [self] = 1
+        # Update transitive closure: node and its ancestors get self
+        # and its descendants as new descendants and vice versa.
+        d = self.desc | (1 << self.idx)
+        a = node.anc  | (1 << node.idx)
+        for i in bits (a) :
+            self.net.by_idx [i].desc |= d
+        for i in bits (d) :
+            self.net.by_idx [i].anc  |= a
         if self in self.net.roots :
             del self.net.roots [self]
     # end def append_parent
 
-    def leaves (self, root = None) :
-        """ The root can also be a leaf
+    def flat_tree (self) :
+        """ The decision tree as flat arrays in breadth-first order
+            starting with the root: Split gene (-1 for a leaf), indexes
+            of the two children, and probability of a one for leaves.
         """
-        if not root :
-            root = self.dnode
-        if isinstance (root, DLeaf) :
-            yield (root)
-        else :
-            for c in root.children :
-                if isinstance (c, DLeaf) :
-                    yield (c)
-                else :
-                    for cx in self.leaves (c) :
-                        yield (cx)
-    # end def leaves
-
-    def is_transitive_parent (self, node, visited = None) :
-        if visited is None :
-            visited = {}
-        for c in self.children :
-            if c in visited :
-                continue
-            visited [c] = 1
-            if node is c :
-                return True
-            if c.is_transitive_parent (node, visited) :
-                return True
-        return False
+        var   = []
+        child = []
+        p     = []
+        tree  = [self.dnode]
+        for dn in tree :
+            if isinstance (dn, DLeaf) :
+                var.append   (-1)
+                child.append ((0, 0))
+                p.append     (dn.p)
+            else :
+                var.append   (dn.idx)
+                child.append ((len (tree), len (tree) + 1))
+                p.append     (0.0)
+                tree.extend  (dn.children)
+        return \
+            ( np.array (var,   dtype = np.intp)
+            , np.array (child, dtype = np.intp)
+            , np.array (p)
+            )
+    # end def flat_tree
+
+    def is_transitive_parent (self, node) :
+        return bool ((self.desc >> node.idx) & 1)
     # end def is_transitive_parent
 
     def may_append_parent (self, node) :
+        self.net.nfeasible += 1
         if node is self :
             return False
         if  (self.net.maxparent and len (self.parents) >= self.net.maxparent) :
@@ -226,11 +424,54 @@ class BNode (object) :
 
 # end class BNode
 
+class Candidate (object) :
+    """ Candidate split of a leaf on the gene of bnode, a compact
+        record. The DNode and its two DLeaf children are only created
+        by materialize when the split is performed.
+    """
+    __slots__ = ('leaf', 'bnode', 'gain')
+
+    def __init__ (self, leaf, bnode, gain) :
+        self.leaf  = leaf
+        self.bnode = bnode
+        self.gain  = gain
+    # end def __init__
+
+    @property
+    def idx (self) :
+        return self.bnode.idx
+    # end def idx
+
+    def feasible (self) :
+        f = self.leaf.bnode.may_append_parent (self.bnode)
+        self.leaf.debug \
+            ( "feasible %s: split %s on %s"
+            % (f, self.leaf.idx, self.idx)
+            )
+        return f
+    # end def feasible
+
+    def materialize (self) :
+        leaf = self.leaf
+        cidx = leaf.cidx
+        if isinstance (leaf.parent, BNode) :
+            cidx = None
+        n = DNode (self.bnode, leaf.parent, cidx)
+        leaf.__class__ (leaf.bnode, n, 0, mask = n.msplit [0])
+        leaf.__class__ (leaf.bnode, n, 1, mask = n.msplit [1])
+        n.gain = self.gain
+        return n
+    # end def materialize
+
+# end class Candidate
+
 class DNode (object) :
     """ Binary decision tree node
         A Tree either has two children.
         A child may be a leaf not (which contains a single probability).
         or another DNode.
+        The samples of a node are a bitset of population rows, splits
+        are computed by AND with the column of the split gene.
     """
 
     def __init__ (self, bnode, parent, cidx = None) :
@@ -240,15 +481,15 @@ class DNode (object) :
         self.children = []
         self.parent   = parent
         if cidx is None :
-            self.genes = parent.genes
+            self.mask = parent.mask
+            self.path = ()
         else :
-            self.genes = parent.gsplit [cidx]
+            self.mask = parent.msplit [cidx]
+            self.path = parent.path + (cidx,)
         self.lvl      = self.parent.lvl + 1
-        self.gsplit   = [[], []]
-        self.n        = 0
-        for g in self.genes :
-            self.gsplit [g [self.idx]].append (g)
-            self.n += 1
+        col           = bnode.net.columns [self.idx]
+        self.msplit   = [self.mask & ~col, self.mask & col]
+        self.n        = popcount (self.mask)
     # end def __init__
 
     def __repr__ (self) :
@@ -261,49 +502,35 @@ class DNode (object) :
     # end def __repr__
     __str__ = __repr__
 
-    def feasible (self) :
-        assert self.idx == self.bnode.idx
-        assert self.idx != self.parent.idx
-        f = self.children [0].bnode.may_append_parent (self.bnode)
-        self.debug \
-            ( "feasible %s: split %s on %s"
-            % (f, self.children [0].bnode.idx, self.idx)
-            )
-        return f
-    # end def feasible
-
 # end class DNode
 
 class DLeaf (object) :
     """ Binary decision tree leaf
     """
 
-    def __init__ (self, bnode, parent, cidx, genes) :
+    def __init__ (self, bnode, parent, cidx, mask) :
         self.bnode      = bnode
         self.idx        = bnode.idx
         self.cidx       = cidx
         self.parent     = parent
         self.lvl        = parent.lvl + 1
-        self.genes      = genes
+        self.mask       = mask
+        self.gains      = None
+        self.path       = ()
+        if not isinstance (parent, BNode) :
+            self.path   = parent.path + (cidx,)
         self.candidates = {}
         self.by_gain    = None
         self.debug      = self.bnode.debug
         self.min_split  = self.bnode.net.min_split
-        self.n  = 0
-        self.n1 = 0
-        for g in self.genes :
-            if g [self.idx] :
-                self.n1 += 1
-            self.n += 1
+        self.n  = popcount (mask)
+        self.n1 = popcount (mask & bnode.net.columns [self.idx])
         if self.n == 0 :
             self.p = 1.0
         else :
             self.p = 1.0 * self.n1 / self.n
-        lgamma = self.bnode.net.lgamma
-        self.score = 0.0
-        self.score += lgamma (1 + self.n1)
-        self.score += lgamma (1 + self.n - self.n1)
-        self.score -= lgamma (2 + self.n)
+        self.score = leaf_score (self.n, self.n1, self.bnode.net.lgamma)
+        self.bnode.net.account (getsizeof (mask))
         if not isinstance (self.parent, BNode) :
             self.parent.children.append (self)
             assert len (self.parent.children) <= 2
@@ -333,8 +560,21 @@ class DLeaf (object) :
 
     def del_candidate (self, cand) :
         del self.candidates [cand.idx]
+        net = self.bnode.net
+        net.nlive -= 1
+        net.account (-net.cand_bytes)
     # end def del_candidate
 
+    def drop_gains (self) :
+        """ The precomputed gains are only needed for creating the
+            candidates, free them afterwards.
+        """
+        if self.gains is not None :
+            l = len (self.gains)
+            self.bnode.net.account (-(getsizeof (self.gains) + 24 * l))
+            self.gains = None
+    # end def drop_gains
+
     def try_add_candidate (self, bnode) :
         """ Try split on bnode
         """
@@ -349,20 +589,34 @@ class DLeaf (object) :
             if p.idx == idx :
                 return
             p = p.parent
-        cidx = self.cidx
-        if isinstance (self.parent, BNode) :
-            cidx = None
-        n  = DNode (bnode, self.parent, cidx)
-        c1 = self.__class__ (self.bnode, n, 0, genes = n.gsplit [0])
-        c2 = self.__class__ (self.bnode, n, 1, genes = n.gsplit [1])
-        n.gain = c1.score + c2.score - self.score - self.bnode.net.cutoff
-        if n.gain > 0 :
-            self.candidates [n.idx] = n
-        return n.gain
+        net = self.bnode.net
+        net.ncandidates += 1
+        if self.gains is not None :
+            # Computed in the worker pool
+            gain = self.gains [idx]
+        else :
+            m1   = self.mask & net.columns [idx]
+            n    = popcount (m1)
+            n1   = popcount (m1 & net.columns [self.idx])
+            gain = \
+                ( leaf_score (self.n - n, self.n1 - n1, net.lgamma)
+                + leaf_score (n, n1, net.lgamma)
+                - self.score
+                - net.cutoff
+                )
+        if gain > 0 :
+            self.candidates [idx] = Candidate (self, bnode, gain)
+            net.nlive += 1
+            net.peak   = max (net.peak, net.nlive)
+            net.account (net.cand_bytes)
+        return gain
     # end def try_add_candidate
 
     def split (self, idx) :
-        cand = self.candidates [idx]
+        """ Replace this leaf by the DNode of candidate idx, returns
+            the new DNode.
+        """
+        cand = self.candidates [idx].materialize ()
         if isinstance (self.parent, BNode) :
             assert self.cidx == 0
             self.parent.dnode = cand
@@ -373,10 +627,19 @@ class DLeaf (object) :
         self.debug ("split (bnode):", cand.bnode.idx, self.bnode.idx, end = ' ')
         self.debug ("cbnode:", cand.children [0].idx)
         self.bnode.append_parent (cand.bnode)
+        # This leaf is replaced by cand, its candidates are stale
+        net = self.bnode.net
+        net.nlive -= len (self.candidates)
+        net.account (-net.cand_bytes * len (self.candidates))
+        self.candidates = {}
+        self.bnode.net.split_gains (cand.children)
         for node in self.bnode.net.nodes :
             if self.bnode.may_append_parent (node) :
                 for l in cand.children :
                     g = l.try_add_candidate (node)
+        for l in cand.children :
+            l.drop_gains ()
+        return cand
     # end def split
 
 # end class DLeaf
@@ -384,6 +647,9 @@ class DLeaf (object) :
 class HBOA (PMBGA) :
     """ hierarchical Bayesian Optimization Algorithm
     """
+    # With score_jobs (see PMBGA) splits of leaves with at least
+    # split_min elements (rows times genes) are scored in parallel
+    split_min = 1 << 16
 
     def build_model (self, p_pop) :
         self.__super.build_model (p_pop)
@@ -405,12 +671,23 @@ class HBOA (PMBGA) :
         return self.l_gamma [x]
     # end def lgamma
 
-    def sample_individual (self, p, pop) :
-        d = self.net.sample_model ()
-        assert len (d) == len (self)
-        for k in sorted (d) :
-            self.set_allele (p, pop, k, d [k])
-    # end def sample_individual
+    def model_stats (self) :
+        return dict \
+            ( nsplit             = self.net.nsplit
+            , candidates         = self.net.ncandidates
+            , feasibility_checks = self.net.nfeasible
+            , peak_candidates    = self.net.peak
+            , peak_bytes         = self.net.peak_bytes
+            )
+    # end def model_stats
+
+    def sample_population (self, n) :
+        return self.net.sample_population (n, self.rng)
+    # end def sample_population
+
+    def surrogate_features (self, m) :
+        return self.net.contexts (m)
+    # end def surrogate_features
 
     def post_init (self) :
         self.__super.post_init ()
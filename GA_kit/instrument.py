@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+from rsclib.autosuper import autosuper
+
+class Generation_Record (object) :
+    """ Timings (in seconds) of the phases of one generation and
+        counters, e.g., statistics of the model built.
+    """
+
+    def __init__ (self, generation = None) :
+        self.generation = generation
+        self.timings    = {}
+        self.counters   = {}
+    # end def __init__
+
+    def add_time (self, phase, seconds) :
+        self.timings [phase] = self.timings.get (phase, 0.0) + seconds
+    # end def add_time
+
+    def as_dict (self) :
+        d = dict (generation = self.generation)
+        d.update (self.counters)
+        d.update (('time_' + k, v) for k, v in self.timings.items ())
+        return d
+    # end def as_dict
+
+    def __repr__ (self) :
+        return "%s (%r)" % (self.__class__.__name__, self.as_dict ())
+    # end def __repr__
+    __str__ = __repr__
+
+# end class Generation_Record
+
+class Instrumentation (autosuper) :
+    """ Collect a Generation_Record per generation of an SGA. Pass an
+        instance as the instrumentation parameter of SGA. Phases timed
+        are extract (reading the parents into a matrix), build_model,
+        sample_model and evaluate. When PGApack evaluates the
+        individuals itself (no evaluate_batch or evaluator) the
+        evaluate phase also includes population replacement. The
+        first record includes the evaluation of the initial
+        population. If a callback is given it is called with each
+        finished record, if keep is False records are not retained
+        in generations.
+    """
+
+    def __init__ (self, callback = None, keep = True) :
+        self.callback    = callback
+        self.keep        = keep
+        self.generations = []
+        self.current     = Generation_Record ()
+    # end def __init__
+
+    def add_time (self, phase, seconds) :
+        self.current.add_time (phase, seconds)
+    # end def add_time
+
+    def count (self, **counters) :
+        self.current.counters.update (counters)
+    # end def count
+
+    def end_generation (self, generation) :
+        rec = self.current
+        rec.generation = generation
+        self.current   = Generation_Record ()
+        if self.keep :
+            self.generations.append (rec)
+        if self.callback :
+            self.callback (rec)
+        return rec
+    # end def end_generation
+
+    def summary (self, file) :
+        """ Print total and mean time per phase over all generations
+        """
+        totals = {}
+        for rec in self.generations :
+            for k, v in rec.timings.items () :
+                totals [k] = totals.get (k, 0.0) + v
+        n = max (len (self.generations), 1)
+        print ("Generations: %d" % len (self.generations), file = file)
+        for k in sorted (totals) :
+            print \
+                ( "%-15s total: %10.4fs mean: %10.6fs"
+                % (k, totals [k], totals [k] / n)
+                , file = file
+                )
+    # end def summary
+
+# end class Instrumentation
@@ -0,0 +1,401 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+""" Island model: Several populations, each in its own process,
+    optimize the same problem and periodically exchange migrants.
+"""
+
+from __future__ import print_function
+import random
+import numpy as np
+from time import perf_counter
+from argparse import ArgumentParser
+from multiprocessing import Process, Queue, Event
+from queue import Empty
+from pga import PGA_NEWPOP, PGA_OLDPOP
+from rsclib.autosuper import autosuper
+from .benchmark import quiet
+from .deceptive import Dec_SGA, Dec_ECGA, Dec_HBOA
+
+topologies = ('ring', 'full', 'random')
+policies   = ('best', 'random')
+
+class Island (autosuper) :
+    """ Mixin for an SGA (or derived class) running as an island.
+        At the end of every interval generations migrants are sent to
+        the outboxes (the inboxes of the neighbouring islands) and all
+        migrants that arrived in our inbox replace the worst
+        individuals. Migration is asynchronous so that islands never
+        wait for each other. An island that finds the optimum sets the
+        done event which stops all islands.
+    """
+
+    def island_setup \
+        ( self, number, inbox, outboxes, done
+        , interval = 10
+        , migrants = 2
+        , topology = 'ring'
+        , policy   = 'best'
+        ) :
+        self.island         = number
+        self.inbox          = inbox
+        self.outboxes       = outboxes
+        self.done           = done
+        self.interval       = interval
+        self.migrants       = migrants
+        self.topology       = topology
+        self.policy         = policy
+        self.island_rng     = np.random.default_rng (self.random_seed)
+        self.migration_time = 0.0
+        self.sent           = 0
+        self.received       = 0
+        for q in self.outboxes :
+            # Don't block on exit when a neighbour stopped reading
+            q.cancel_join_thread ()
+    # end def island_setup
+
+    def emigrants (self, pop) :
+        """ Matrix and evaluations of the individuals to send
+        """
+        evals = np.array \
+            ([self.get_evaluation (p, pop) for p in range (self.pop_size)])
+        if self.policy == 'best' :
+            order = np.argsort (evals, kind = 'stable')
+            if self.maximize :
+                order = order [::-1]
+            idx = order [:self.migrants]
+        else :
+            idx = self.island_rng.choice \
+                (self.pop_size, self.migrants, replace = False)
+        idx = [int (i) for i in idx]
+        return self.get_population_matrix (pop, idx), evals [idx]
+    # end def emigrants
+
+    def endofgen (self) :
+        self.__super.endofgen ()
+        if self.outboxes and self.generation () % self.interval == 0 :
+            # At the end of a generation the current population is NEWPOP
+            self.migrate (PGA_NEWPOP)
+    # end def endofgen
+
+    def immigrate (self, pop, batches) :
+        """ Replace the worst individuals by the arrived migrants
+        """
+        evals = np.array \
+            ([self.get_evaluation (p, pop) for p in range (self.pop_size)])
+        order = np.argsort (evals, kind = 'stable')
+        if not self.maximize :
+            order = order [::-1]
+        order = [int (i) for i in order [:self.pop_size // 2]]
+        for m, e in batches :
+            n   = min (len (m), len (order))
+            idx = order [:n]
+            del order [:n]
+            self.set_population_matrix (pop, idx, m [:n])
+            for p, v in zip (idx, e) :
+                self.set_evaluation (p, pop, float (v))
+            self.received += n
+    # end def immigrate
+
+    def migrate (self, pop) :
+        start  = perf_counter ()
+        outbox = self.outboxes
+        if self.topology == 'random' :
+            outbox = [outbox [self.island_rng.integers (len (outbox))]]
+        if outbox :
+            m, e = self.emigrants (pop)
+            for q in outbox :
+                q.put ((m, e))
+                self.sent += len (m)
+        batches = []
+        while True :
+            try :
+                batches.append (self.inbox.get_nowait ())
+            except Empty :
+                break
+        if batches :
+            self.immigrate (pop, batches)
+        self.migration_time += perf_counter () - start
+    # end def migrate
+
+    def stop_cond (self) :
+        if self.done.is_set () :
+            return True
+        if self.__super.stop_cond () :
+            if self.success () :
+                self.done.set ()
+            return True
+        return False
+    # end def stop_cond
+
+    def success (self) :
+        best = self.get_best_index (PGA_OLDPOP)
+        return self.get_evaluation (best, PGA_OLDPOP) >= self.maxeval
+    # end def success
+
+# end class Island
+
+class Isl_SGA (Island, Dec_SGA) :
+    pass
+
+class Isl_ECGA (Island, Dec_ECGA) :
+    pass
+
+class Isl_HBOA (Island, Dec_HBOA) :
+    pass
+
+def run_island (number, params, inbox, outboxes, done, results, migration) :
+    """ Process target running one island, params are as for
+        benchmark.run_deceptive, migration is a dict with the
+        migration parameters of Island.island_setup.
+        A report is always put on results, if the island fails it
+        contains the error and all other islands are stopped.
+    """
+    quiet ()
+    try :
+        report = island_report \
+            (number, params, inbox, outboxes, done, migration)
+    except Exception as err :
+        done.set ()
+        report = dict \
+            ( island = number
+            , seed   = params ['seed']
+            , error  = '%s: %s' % (err.__class__.__name__, err)
+            )
+    results.put (report)
+# end def run_island
+
+def island_report (number, params, inbox, outboxes, done, migration) :
+    """ Run one island, returns the report of the run
+    """
+    cls = globals () ['Isl_' + params ['cls']]
+    fun = ((params ['trap_size'], params ['ntraps']),)
+    start = perf_counter ()
+    d = cls \
+        ( fun
+        , popsize     = params ['popsize']
+        , random_seed = params ['seed']
+        , maxiter     = params ['maxiter']
+        , ** params.get ('kw', {})
+        )
+    d.island_setup (number, inbox, outboxes, done, ** migration)
+    d.run ()
+    d.close ()
+    t    = perf_counter () - start
+    best = d.get_best_index (PGA_OLDPOP)
+    return \
+        ( dict
+            ( island         = number
+            , seed           = params ['seed']
+            , generations    = d.generation ()
+            , evaluations    = d.eval_counter
+            , time           = t
+            , evals_per_sec  = d.eval_counter / t
+            , migration_time = d.migration_time
+            , sent           = d.sent
+            , received       = d.received
+            , best           = d.get_evaluation (best, PGA_OLDPOP)
+            , success        = bool (d.success ())
+            )
+        )
+# end def island_report
+
+def run_islands (params, ** migration) :
+    """ Run one island per entry of params (see run_island) in its
+        own process, returns the list of per-island reports. If an
+        island fails or dies the other islands are stopped and a
+        RuntimeError is raised.
+    """
+    n        = len (params)
+    inboxes  = [Queue () for i in range (n)]
+    done     = Event ()
+    results  = Queue ()
+    topology = migration.get ('topology', 'ring')
+    procs    = []
+    for i, p in enumerate (params) :
+        if n == 1 :
+            outboxes = []
+        elif topology == 'ring' :
+            outboxes = [inboxes [(i + 1) % n]]
+        else :
+            outboxes = [inboxes [j] for j in range (n) if j != i]
+        proc = Process \
+            ( target = run_island
+            , args   = (i, p, inboxes [i], outboxes, done, results, migration)
+            )
+        proc.start ()
+        procs.append (proc)
+    reports = []
+    while len (reports) < n :
+        try :
+            reports.append (results.get (timeout = 1))
+        except Empty :
+            # An island killed without a report never sends one
+            if any (p.exitcode not in (None, 0) for p in procs) :
+                break
+    errors = [r for r in reports if 'error' in r]
+    if len (reports) < n or errors :
+        done.set ()
+        for proc in procs :
+            proc.join (5)
+            if proc.is_alive () :
+                proc.terminate ()
+        msgs = ['island %d: %s' % (r ['island'], r ['error']) for r in errors]
+        dead = ['exit code %s' % p.exitcode for p in procs if p.exitcode]
+        raise RuntimeError \
+            ("Island run failed: %s" % '; '.join (msgs or dead))
+    for proc in procs :
+        proc.join ()
+    return sorted (reports, key = lambda r : r ['island'])
+# end def run_islands
+
+def shuffled_funidx (fun, seed) :
+    """ Shuffled gene indexes of the trap functions, all islands must
+        optimize the same problem so we can't let each island shuffle
+        with its own random seed.
+    """
+    length  = sum (k * n for k, n in fun)
+    indexes = list (range (length))
+    random.Random (seed).shuffle (indexes)
+    funidx  = []
+    for bits, nfunc in fun :
+        for n in range (nfunc) :
+            funidx.append (indexes [:bits])
+            del indexes [:bits]
+    return funidx
+# end def shuffled_funidx
+
+def main (argv = None) :
+    cmd = ArgumentParser ()
+    cmd.add_argument \
+        ( '-c', '--class'
+        , dest    = 'cls'
+        , help    = "Class to use, one of SGA, ECGA, HBOA, "
+                    "default=%(default)s"
+        , default = 'ECGA'
+        )
+    cmd.add_argument \
+        ( '-d', '--deceptive-function'
+        , help    = "Deceptive function with length/count, "
+                    "default=%(default)s"
+        , default = '5/10'
+        )
+    cmd.add_argument \
+        ( '-I', '--islands'
+        , type    = int
+        , help    = "Number of islands, default=%(default)s"
+        , default = 4
+        )
+    cmd.add_argument \
+        ( '-i', '--interval'
+        , type    = int
+        , help    = "Migration interval in generations, default=%(default)s"
+        , default = 5
+        )
+    cmd.add_argument \
+        ( '-k', '--migrants'
+        , type    = int
+        , help    = "Number of migrants, default=%(default)s"
+        , default = 2
+        )
+    cmd.add_argument \
+        ( '-m', '--maxiter'
+        , type    = int
+        , help    = "Maximum number of generations, default=%(default)s"
+        , default = 200
+        )
+    cmd.add_argument \
+        ( '--policy'
+        , help    = "Selection of migrants, default=%(default)s"
+        , choices = policies
+        , default = 'best'
+        )
+    cmd.add_argument \
+        ( '-p', '--popsize'
+        , type    = int
+        , help    = "Population size of each island, default=%(default)s"
+        , default = 500
+        )
+    cmd.add_argument \
+        ( '-R', '--random-seed'
+        , type    = int
+        , help    = "Random seed of first island, the others use the "
+                    "following seeds, default=%(default)s"
+        , default = 42
+        )
+    cmd.add_argument \
+        ( '-s', '--shuffle'
+        , help    = "Shuffle genes of deceptive functions"
+        , action  = "store_true"
+        )
+    cmd.add_argument \
+        ( '-t', '--topology'
+        , help    = "Migration topology, default=%(default)s"
+        , choices = topologies
+        , default = 'ring'
+        )
+    args = cmd.parse_args (argv)
+    trap_size, ntraps = (int (i) for i in args.deceptive_function.split ('/'))
+    kw = {}
+    if args.shuffle :
+        fun = ((trap_size, ntraps),)
+        kw ['funidx'] = shuffled_funidx (fun, args.random_seed)
+    params = \
+        [ dict
+            ( cls       = args.cls
+            , trap_size = trap_size
+            , ntraps    = ntraps
+            , popsize   = args.popsize
+            , seed      = args.random_seed + i
+            , maxiter   = args.maxiter
+            , kw        = kw
+            )
+          for i in range (args.islands)
+        ]
+    reports = run_islands \
+        ( params
+        , interval = args.interval
+        , migrants = args.migrants
+        , topology = args.topology
+        , policy   = args.policy
+        )
+    for r in reports :
+        print \
+            ( "Island %(island)d: best %(best)g success %(success)s "
+              "generations %(generations)d evaluations %(evaluations)d "
+              "%(evals_per_sec).1f evals/s migration %(migration_time).3fs "
+              "sent %(sent)d received %(received)d" % r
+            )
+    print ("Total evaluations: %d" % sum (r ['evaluations'] for r in reports))
+# end def main
+
+if __name__ == '__main__' :
+    main ()
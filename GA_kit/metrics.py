@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+import csv
+import json
+from queue            import Queue
+from threading        import Thread
+from rsclib.autosuper import autosuper
+
+class Metrics_Sink (autosuper) :
+    """ Write one record per generation to a file, either as JSON
+        lines or, if the filename ends in .csv or fmt is 'csv', as
+        CSV. An instance is used as the callback of an
+        Instrumentation, it gets a Generation_Record. The records are
+        written by a background thread to a buffered file, so the
+        algorithm only pays for putting the record into a queue.
+        The columns of a CSV file are the keys of the first record,
+        keys appearing later are not written.
+        The sink must be closed to write the remaining records.
+    """
+    # Size of the write buffer of the file in bytes
+    buffering = 1 << 16
+
+    def __init__ (self, filename, fmt = None) :
+        if fmt is None :
+            fmt = 'csv' if filename.endswith ('.csv') else 'jsonl'
+        if fmt not in ('csv', 'jsonl') :
+            raise ValueError ("Unknown metrics format: %s" % fmt)
+        self.fmt    = fmt
+        self.file   = open \
+            (filename, 'w', buffering = self.buffering, newline = '')
+        self.writer = None
+        self.queue  = Queue ()
+        self.thread = Thread (target = self.run, daemon = True)
+        self.thread.start ()
+    # end def __init__
+
+    def __call__ (self, record) :
+        self.queue.put (record.as_dict ())
+    # end def __call__
+
+    def close (self) :
+        """ Write the remaining records and close the file
+        """
+        if self.thread is None :
+            return
+        self.queue.put (None)
+        self.thread.join ()
+        self.thread = None
+        self.file.close ()
+    # end def close
+
+    def run (self) :
+        """ The writer thread
+        """
+        while True :
+            d = self.queue.get ()
+            if d is None :
+                break
+            self.write (d)
+    # end def run
+
+    def write (self, d) :
+        if self.fmt == 'jsonl' :
+            self.file.write (json.dumps (d))
+            self.file.write ('\n')
+            return
+        if self.writer is None :
+            self.writer = csv.DictWriter \
+                (self.file, fieldnames = list (d), extrasaction = 'ignore')
+            self.writer.writeheader ()
+        self.writer.writerow (d)
+    # end def write
+
+# end class Metrics_Sink
@@ -0,0 +1,310 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+""" Automatic population sizing: Find the minimum population size
+    for which at least m of n independent runs succeed, either with
+    the bisection method or with a parameter-less scheme racing
+    growing population sizes concurrently. Independent runs are
+    performed in parallel worker processes.
+"""
+
+from __future__ import print_function
+from argparse import ArgumentParser
+from multiprocessing import Pool
+from .benchmark import quiet, run_deceptive, run_parallel
+
+def even (n) :
+    """ PMBGA needs an even population size
+    """
+    n = int (n)
+    return n + n % 2
+# end def even
+
+class Population_Sizing (object) :
+    """ Runs n independent runs per population size and records the
+        outcome. The params are passed to run_deceptive, popsize and
+        seed are set for each run.
+    """
+
+    def __init__ (self, params, n = 10, m = 9, jobs = None, verbose = False) :
+        self.params  = params
+        self.n       = n
+        self.m       = m
+        self.jobs    = jobs
+        self.verbose = verbose
+        self.tested  = {}
+        # Total number of evaluations spent in the search
+        self.cost    = 0
+    # end def __init__
+
+    def run_sizes (self, popsizes) :
+        """ Run n runs for each of the population sizes concurrently,
+            returns a dictionary of success flags indexed by size.
+        """
+        todo = [p for p in popsizes if p not in self.tested]
+        params = []
+        for popsize in todo :
+            for seed in range (1, self.n + 1) :
+                p = dict (self.params, popsize = popsize, seed = seed)
+                params.append (p)
+        results = {}
+        for r in run_parallel (run_deceptive, params, self.jobs) :
+            results.setdefault (r ['popsize'], []).append (r)
+            self.cost += r ['evaluations']
+        for popsize in todo :
+            runs = results [popsize]
+            ok   = [r for r in runs if r ['success']]
+            evals = None
+            if ok :
+                evals = sum (r ['evaluations'] for r in ok) / len (ok)
+            self.tested [popsize] = dict \
+                ( success     = len (ok) >= self.m
+                , successes   = len (ok)
+                , evaluations = evals
+                )
+            if self.verbose :
+                print \
+                    ( "popsize %6d: %d/%d successful, evaluations: %s"
+                    % (popsize, len (ok), self.n, evals)
+                    )
+        return dict ((p, self.tested [p]['success']) for p in popsizes)
+    # end def run_sizes
+
+    def succeeds (self, popsize) :
+        return self.run_sizes ([popsize]) [popsize]
+    # end def succeeds
+
+    def bisection (self, start = 100, precision = 0.1, max_popsize = 100000) :
+        """ Standard bisection: Double the population size until the
+            runs succeed (or halve it while they succeed) to find a
+            failing lower and successful upper bound. Then bisect
+            until the bounds are within precision of each other.
+            Returns the upper bound or None if no population size up
+            to max_popsize succeeds.
+        """
+        high = even (start)
+        if self.succeeds (high) :
+            low = even (high // 2)
+            while low < high and self.succeeds (low) :
+                high = low
+                low  = even (low // 2)
+            if low >= high :
+                # Smallest possible population size succeeds
+                return high
+        else :
+            low = high
+            while not self.succeeds (high) :
+                low  = high
+                high = even (2 * high)
+                if high > max_popsize :
+                    return None
+        while (high - low) > precision * high :
+            mid = even ((low + high) // 2)
+            if mid in (low, high) :
+                break
+            if self.succeeds (mid) :
+                high = mid
+            else :
+                low  = mid
+        return high
+    # end def bisection
+
+    def decided (self, sizes, ok, failed) :
+        """ The smallest successful size if it is decided: It has m
+            successful runs and all smaller sizes have more than
+            n - m unsuccessful runs. None if all sizes failed, False
+            if not yet decided.
+        """
+        for popsize in sizes :
+            if ok [popsize] >= self.m :
+                return popsize
+            if failed [popsize] <= self.n - self.m :
+                return False
+        return None
+    # end def decided
+
+    def parameterless (self, start = 100, levels = 5) :
+        """ Race the population sizes start, 2 * start, 4 * start, ...
+            concurrently, runs of smaller sizes are started first.
+            As soon as the smallest successful size is decided (see
+            decided) the remaining runs are terminated, they do not
+            count for the cost of the search. Returns the smallest
+            successful size or None if none of the levels succeeds.
+        """
+        sizes  = [even (start * 2 ** i) for i in range (levels)]
+        params = \
+            [ dict (self.params, popsize = popsize, seed = seed)
+              for popsize in sizes
+              for seed in range (1, self.n + 1)
+            ]
+        ok     = dict ((p, 0) for p in sizes)
+        failed = dict ((p, 0) for p in sizes)
+        evals  = dict ((p, []) for p in sizes)
+        result = False
+        pool   = Pool (self.jobs, initializer = quiet, maxtasksperchild = 1)
+        with pool :
+            for r in pool.imap_unordered (run_deceptive, params) :
+                popsize    = r ['popsize']
+                self.cost += r ['evaluations']
+                if r ['success'] :
+                    ok [popsize] += 1
+                    evals [popsize].append (r ['evaluations'])
+                else :
+                    failed [popsize] += 1
+                result = self.decided (sizes, ok, failed)
+                if result is not False :
+                    # Leaving the with statement terminates the pool
+                    break
+        for popsize in sizes :
+            if not ok [popsize] and not failed [popsize] :
+                continue
+            e = None
+            if evals [popsize] :
+                e = sum (evals [popsize]) / len (evals [popsize])
+            self.tested [popsize] = dict \
+                ( success     = ok [popsize] >= self.m
+                , successes   = ok [popsize]
+                , evaluations = e
+                )
+            if self.verbose :
+                print \
+                    ( "popsize %6d: %d/%d successful of %d finished, "
+                      "evaluations: %s"
+                    % ( popsize, ok [popsize], self.n
+                      , ok [popsize] + failed [popsize], e
+                      )
+                    )
+        return result
+    # end def parameterless
+
+# end class Population_Sizing
+
+def main (argv = None) :
+    cmd = ArgumentParser ()
+    cmd.add_argument \
+        ( '-c', '--class'
+        , dest    = 'cls'
+        , help    = "Class to use, one of SGA, ECGA, HBOA, "
+                    "default=%(default)s"
+        , default = 'ECGA'
+        )
+    cmd.add_argument \
+        ( '-d', '--deceptive-function'
+        , help    = "Deceptive function with length/count, "
+                    "default=%(default)s"
+        , default = '5/10'
+        )
+    cmd.add_argument \
+        ( '-j', '--jobs'
+        , type    = int
+        , help    = "Number of parallel runs, default: number of CPUs"
+        )
+    cmd.add_argument \
+        ( '-k', '--successes'
+        , type    = int
+        , help    = "Number of runs that must succeed, default=%(default)s"
+        , default = 9
+        )
+    cmd.add_argument \
+        ( '-l', '--levels'
+        , type    = int
+        , help    = "Number of population sizes for parameter-less "
+                    "search, default=%(default)s"
+        , default = 5
+        )
+    cmd.add_argument \
+        ( '-m', '--maxiter'
+        , type    = int
+        , help    = "Maximum number of generations, default=%(default)s"
+        , default = 200
+        )
+    cmd.add_argument \
+        ( '--max-popsize'
+        , type    = int
+        , help    = "Give up bisection above this population size, "
+                    "default=%(default)s"
+        , default = 100000
+        )
+    cmd.add_argument \
+        ( '-n', '--runs'
+        , type    = int
+        , help    = "Number of independent runs, default=%(default)s"
+        , default = 10
+        )
+    cmd.add_argument \
+        ( '-P', '--parameterless'
+        , help    = "Use parameter-less search instead of bisection"
+        , action  = "store_true"
+        )
+    cmd.add_argument \
+        ( '--precision'
+        , type    = float
+        , help    = "Relative precision of bisection, default=%(default)s"
+        , default = 0.1
+        )
+    cmd.add_argument \
+        ( '-p', '--popsize'
+        , type    = int
+        , help    = "Initial population size, default=%(default)s"
+        , default = 100
+        )
+    cmd.add_argument \
+        ( '-s', '--shuffle'
+        , help    = "Shuffle genes of deceptive functions"
+        , action  = "store_true"
+        )
+    args = cmd.parse_args (argv)
+    trap_size, ntraps = (int (i) for i in args.deceptive_function.split ('/'))
+    params = dict \
+        ( cls       = args.cls
+        , trap_size = trap_size
+        , ntraps    = ntraps
+        , shuffle   = args.shuffle
+        , maxiter   = args.maxiter
+        )
+    ps = Population_Sizing \
+        (params, args.runs, args.successes, args.jobs, verbose = True)
+    if args.parameterless :
+        popsize = ps.parameterless (args.popsize, args.levels)
+    else :
+        popsize = ps.bisection (args.popsize, args.precision, args.max_popsize)
+    if popsize is None :
+        print ("No successful population size found")
+    else :
+        print \
+            ( "Population size: %d, mean evaluations: %s"
+            % (popsize, ps.tested [popsize]['evaluations'])
+            )
+    print ("Total evaluations of search: %d" % ps.cost)
+# end def main
+
+if __name__ == '__main__' :
+    main ()
@@ -0,0 +1,336 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+""" Benchmark problems for bit-string genetic algorithms. Each problem
+    is called with a matrix of individuals (one row of bits per
+    individual) and returns a vector of evaluations (to be maximized).
+    Problems know their length and their optimum (None if unknown).
+    They are picklable, so they can be used with a Pool_Evaluator.
+    Random instances are generated from a seed and are reproducible.
+"""
+
+import numpy as np
+from rsclib.autosuper import autosuper
+
+class Problem (autosuper) :
+    """ Base class of benchmark problems
+    """
+    optimum = None
+    params  = ()
+
+    def __call__ (self, m) :
+        raise NotImplementedError ("Must be defined in derived class")
+    # end def __call__
+
+    def __repr__ (self) :
+        p = ', '.join ('%s=%s' % (k, getattr (self, k)) for k in self.params)
+        return '%s (%s)' % (self.__class__.__name__, p)
+    # end def __repr__
+
+    def brute_force (self, chunk = 1 << 14) :
+        """ Optimum by evaluating all bit strings, for small problems
+        """
+        best = -np.inf
+        n    = self.length
+        bits = np.arange (n - 1, -1, -1)
+        for start in range (0, 1 << n, chunk) :
+            x    = np.arange (start, min (start + chunk, 1 << n))
+            m    = ((x [:, None] >> bits) & 1).astype (np.uint8)
+            best = max (best, float (self (m).max ()))
+        return best
+    # end def brute_force
+
+# end class Problem
+
+def symbols (m) :
+    """ Bits of m as symbols of the lowest level of a hierarchical
+        problem, -1 is the null symbol of higher levels.
+    """
+    return np.asarray (m, dtype = np.int8)
+# end def symbols
+
+class HTrap (Problem) :
+    """ Hierarchical trap (hTrap1 of Pelikan): Blocks of k symbols are
+        evaluated with a trap and mapped to the symbol of the next
+        level, all zeros to 0, all ones to 1, anything else (or a
+        block containing a null) to the null symbol which contributes
+        nothing. On all but the top level both optima of the trap have
+        value 1, on the top level all zeros only get 0.9. The
+        contributions of level l are multiplied by k**l, so each level
+        contributes the same. The optimum is all ones.
+    """
+    params = ('levels', 'k')
+
+    def __init__ (self, levels = 3, k = 3) :
+        self.levels  = levels
+        self.k       = k
+        self.length  = k ** levels
+        self.optimum = float (self.length * levels)
+    # end def __init__
+
+    def __call__ (self, m) :
+        k = self.k
+        s = symbols (m)
+        f = np.zeros (len (s))
+        for level in range (1, self.levels + 1) :
+            flow = 0.9 if level == self.levels else 1.0
+            b    = s.reshape (len (s), -1, k)
+            null = (b < 0).any (axis = 2)
+            u    = b.sum (axis = 2)
+            t    = np.where (u == k, 1.0, flow - u * flow / (k - 1))
+            f   += np.where (null, 0.0, t).sum (axis = 1) * k ** level
+            s    = np.where (null | ((u != 0) & (u != k)), -1, u // k)
+            s    = s.astype (np.int8)
+        return f
+    # end def __call__
+
+# end class HTrap
+
+class HIFF (Problem) :
+    """ Hierarchical if and only if (Watson): Each bit contributes 1,
+        each block of 2**l bits that is all zeros or all ones
+        contributes its size. The two optima are all zeros and all
+        ones.
+    """
+    params = ('levels',)
+
+    def __init__ (self, levels = 6) :
+        self.levels  = levels
+        self.length  = 2 ** levels
+        self.optimum = float (self.length * (levels + 1))
+    # end def __init__
+
+    def __call__ (self, m) :
+        s = symbols (m)
+        f = np.full (len (s), float (self.length))
+        for level in range (1, self.levels + 1) :
+            b    = s.reshape (len (s), -1, 2)
+            same = (b [:, :, 0] == b [:, :, 1]) & (b [:, :, 0] >= 0)
+            f   += same.sum (axis = 1) * 2.0 ** level
+            s    = np.where (same, b [:, :, 0], -1).astype (np.int8)
+        return f
+    # end def __call__
+
+# end class HIFF
+
+class NK_Landscape (Problem) :
+    """ NK landscape with the neighborhood of gene i consisting of the
+        genes i .. i+k (cyclic), each gene has a table of 2**(k+1)
+        random contributions. With this neighborhood the optimum is
+        found by dynamic programming.
+    """
+    params = ('n', 'k', 'seed')
+
+    def __init__ (self, n = 50, k = 4, seed = 42) :
+        assert 0 < k < n
+        self.n       = n
+        self.k       = k
+        self.seed    = seed
+        self.length  = n
+        rng          = np.random.default_rng (seed)
+        self.table   = rng.random ((n, 2 ** (k + 1)))
+        self.idx     = (np.arange (n) [:, None] + np.arange (k + 1)) % n
+        self.weights = 1 << np.arange (k, -1, -1)
+        self.optimum = self.dynamic_programming ()
+    # end def __init__
+
+    def __call__ (self, m) :
+        codes = np.asarray (m, dtype = np.int64) [:, self.idx] @ self.weights
+        return self.table [np.arange (self.n), codes].sum (axis = 1)
+    # end def __call__
+
+    def dynamic_programming (self) :
+        """ For each assignment of the first k genes: Add genes one at
+            a time, the state is the value of the last k genes, the
+            value of a state is the best sum of the completed
+            contributions. The last k contributions wrap around to
+            the first k genes.
+        """
+        n, k  = self.n, self.k
+        ns    = 1 << k
+        codes = (np.arange (ns) [:, None] << 1) | np.arange (2)
+        nxt   = (codes & (ns - 1)).ravel ()
+        best  = -np.inf
+        for a in range (ns) :
+            v     = np.full (ns, -np.inf)
+            v [a] = 0.0
+            for j in range (k, n) :
+                val = (v [:, None] + self.table [j - k][codes]).ravel ()
+                v   = np.full (ns, -np.inf)
+                np.maximum.at (v, nxt, val)
+            seq = (np.arange (ns) << k) | a
+            for t in range (k) :
+                c = (seq >> (k - 1 - t)) & (2 * ns - 1)
+                v = v + self.table [n - k + t][c]
+            best = max (best, float (v.max ()))
+        return best
+    # end def dynamic_programming
+
+# end class NK_Landscape
+
+def max_plus (a, b, chunk = 1 << 22) :
+    """ Matrix product in max-plus algebra: r [i, k] is the maximum
+        of a [i, j] + b [j, k] over j. Computed in blocks of rows of
+        a, so at most about chunk elements are held at once.
+    """
+    r    = np.empty ((a.shape [0], b.shape [1]))
+    step = max (1, chunk // (b.shape [0] * b.shape [1]))
+    for lo in range (0, a.shape [0], step) :
+        blk = a [lo:lo + step, :, None] + b [None, :, :]
+        r [lo:lo + step] = blk.max (axis = 1)
+    return r
+# end def max_plus
+
+class Ising_Spin_Glass (Problem) :
+    """ +-J Ising spin glass on a side x side torus, the fitness is the
+        sum of J * s_i * s_j over all edges with spins s = 2 * bit - 1.
+        Spin i is in row i // side and column i % side. The optimum
+        (the negated ground state energy) is computed exactly with a
+        transfer matrix over the rows for side up to transfer_max_side,
+        larger instances have an unknown optimum.
+    """
+    params = ('side', 'seed')
+    transfer_max_side = 8
+
+    def __init__ (self, side = 6, seed = 42) :
+        self.side    = side
+        self.seed    = seed
+        n            = side * side
+        self.length  = n
+        rng          = np.random.default_rng (seed)
+        i            = np.arange (n)
+        right        = i // side * side + (i + 1) % side
+        down         = (i + side) % n
+        self.a       = np.concatenate ((i, i))
+        self.b       = np.concatenate ((right, down))
+        self.j       = rng.choice ((-1, 1), len (self.a))
+        if side <= self.transfer_max_side :
+            self.optimum = self.transfer_matrix ()
+    # end def __init__
+
+    def __call__ (self, m) :
+        s = 2 * np.asarray (m, dtype = np.int8) - 1
+        return (self.j * s [:, self.a] * s [:, self.b]).sum (axis = 1)
+    # end def __call__
+
+    def transfer_matrix (self) :
+        """ Optimum by a transfer matrix over the rows: Entry [a, b]
+            of the matrix of row r is the value of the edges within
+            row r in state a plus the edges down to the next row in
+            state b. The max-plus product of the matrices of all rows
+            closed over the periodic boundary (the diagonal) gives
+            the optimum. Needs side * 8 ** side operations.
+        """
+        side   = self.side
+        n      = side * side
+        states = np.arange (1 << side)
+        s      = 2 * ((states [:, None] >> np.arange (side)) & 1) - 1
+        jr     = self.j [:n].reshape (side, side)
+        jd     = self.j [n:].reshape (side, side)
+        sright = np.roll (s, -1, axis = 1)
+        total  = None
+        for r in range (side) :
+            t = (s * sright * jr [r]).sum (axis = 1) [:, None] \
+              + (s * jd [r]) @ s.T
+            total = t if total is None else max_plus (total, t)
+        return float (np.diag (total).max ())
+    # end def transfer_matrix
+
+# end class Ising_Spin_Glass
+
+class Max_Sat (Problem) :
+    """ Random MAX-3-SAT with a planted solution: Clauses are drawn at
+        random and rejected if not satisfied by a random hidden
+        assignment, so all clauses can be satisfied. The default number
+        of clauses is at the satisfiability threshold of 4.27 n.
+    """
+    params = ('n', 'clauses', 'seed')
+
+    def __init__ (self, n = 50, clauses = None, seed = 42) :
+        if n < 3 :
+            raise ValueError ("Max_Sat needs at least 3 variables")
+        self.n       = n
+        self.clauses = clauses or int (round (4.27 * n))
+        self.seed    = seed
+        self.length  = n
+        rng          = np.random.default_rng (seed)
+        hidden       = rng.integers (0, 2, n)
+        var          = []
+        neg          = []
+        count        = 0
+        while count < self.clauses :
+            # Three distinct variables per clause: reject duplicates
+            v  = rng.integers (0, n, (self.clauses, 3))
+            s  = rng.integers (0, 2, (self.clauses, 3))
+            ok = (hidden [v] ^ s).any (axis = 1)
+            ok &= (v [:, 0] != v [:, 1]) & (v [:, 0] != v [:, 2])
+            ok &= v [:, 1] != v [:, 2]
+            var.append (v [ok])
+            neg.append (s [ok])
+            count += int (ok.sum ())
+        self.var     = np.concatenate (var) [:self.clauses]
+        self.neg     = np.concatenate (neg) [:self.clauses].astype (np.uint8)
+        self.optimum = float (self.clauses)
+    # end def __init__
+
+    def __call__ (self, m) :
+        lit = np.asarray (m, dtype = np.uint8) [:, self.var] ^ self.neg
+        return lit.any (axis = 2).sum (axis = 1).astype (float)
+    # end def __call__
+
+# end class Max_Sat
+
+problem_classes = dict \
+    ( htrap  = HTrap
+    , hiff   = HIFF
+    , nk     = NK_Landscape
+    , ising  = Ising_Spin_Glass
+    , maxsat = Max_Sat
+    )
+
+def make_problem (spec) :
+    """ Create a problem from a specification NAME[:key=value,...],
+        e.g., 'nk:n=100,k=4,seed=1'. Values are converted to int or
+        float if possible.
+    """
+    name, _, args = spec.partition (':')
+    kw = {}
+    for arg in filter (None, args.split (',')) :
+        k, v = arg.split ('=', 1)
+        for conv in (int, float) :
+            try :
+                v = conv (v)
+                break
+            except ValueError :
+                pass
+        kw [k.strip ()] = v
+    return problem_classes [name] (** kw)
+# end def make_problem
@@ -29,18 +29,65 @@
 # ****************************************************************************
 
 import sys
+import numpy as np
+from time import perf_counter
 from math import log
+from concurrent.futures import ProcessPoolExecutor
 from pga  import PGA, PGA_STOP_MAXITER, PGA_STOP_NOCHANGE \
-          , PGA_REPORT_STRING, PGA_POPREPL_RTR
+          , PGA_REPORT_STRING, PGA_POPREPL_RTR, PGA_NEWPOP, PGA_OLDPOP
 from rsclib.autosuper import autosuper
+from .cache      import LRU_Cache
+from .checkpoint import load_checkpoint, save_checkpoint
+from .shared     import Shared_Matrix
+from .surrogate  import Additive_Surrogate
 
 invlog2 = 1.0 / log (2)
 def log2 (x) :
     return log (x) * invlog2
 
+def genome_keys (m) :
+    """ Hashable keys of the rows of the gene matrix m: The genome
+        of each individual packed into bytes.
+    """
+    return [row.tobytes () for row in np.packbits (m, axis = 1)]
+# end def genome_keys
+
+class Fitness_Cache (LRU_Cache) :
+    """ LRU cache of evaluations keyed by the packed genome (see
+        genome_keys)
+    """
+    # Estimated size of an entry without the key
+    entry_bytes = 150
+
+    def size (self, key, evaluation) :
+        return self.entry_bytes + len (key)
+    # end def size
+
+# end class Fitness_Cache
+
 class SGA (PGA, autosuper) :
     """ Simple Genetic Algorithm
         Only binary allele are used.
+        A derived class may define evaluate_batch: It gets a matrix
+        with one row per individual and returns a vector of
+        evaluations. If defined it is called once per generation for
+        all individuals not yet evaluated instead of evaluate.
+        Alternatively an evaluator backend (see evaluator.py) can be
+        given, it takes precedence over evaluate_batch.
+        With a fitness_cache budget (in bytes) the evaluations done
+        in batches are remembered by genome, individuals already seen
+        are not evaluated again (see Fitness_Cache).
+        With quiet set, progress and the model are not printed in each
+        generation, e.g., when recording metrics (see metrics.py).
+        Per-generation timings and counters are collected if an
+        Instrumentation object (see instrument.py) is given.
+        With a checkpoint filename and a checkpoint_interval the
+        state of the run is saved every checkpoint_interval
+        generations. A run is resumed by passing the checkpoint
+        filename as resume. The random number generator of PGApack
+        cannot be saved, a resumed run restarts it from the initial
+        seed, so it is reproducible but will not produce exactly the
+        same individuals as an uninterrupted run.
     """
 
     def __init__ \
@@ -58,8 +105,30 @@ class SGA (PGA, autosuper) :
         , max_GA_iter         = 1000
         , rtr_window_size     = 0
         , tournament_size     = 2
+        , evaluator           = None
+        , instrumentation     = None
+        , checkpoint          = None
+        , checkpoint_interval = 0
+        , resume              = None
+        , fitness_cache       = 0
+        , quiet               = False
         , ** kw
         ) :
+        self.evaluator           = evaluator
+        self.quiet               = quiet
+        self.fitness_cache       = None
+        if fitness_cache :
+            self.fitness_cache   = Fitness_Cache (fitness_cache)
+        self.instrumentation     = instrumentation
+        self.eval_start          = None
+        self.checkpoint          = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.resume_state        = None
+        self.generation_offset   = 0
+        if resume :
+            self.resume_state = load_checkpoint (resume)
+            g = self.resume_state ['generation']
+            max_GA_iter = max (max_GA_iter - g, 1)
         if not rtr_window_size :
             rtr_window_size = int (min (pop_size * 0.2, length))
         PGA.__init__ \
@@ -83,13 +152,256 @@ class SGA (PGA, autosuper) :
         self.eval_counter = 0
     # end def __init__
 
+    def batch_evaluation (self) :
+        """ The function evaluating a matrix of individuals: The
+            evaluator or evaluate_batch, None if neither exists.
+        """
+        if self.evaluator is not None :
+            return self.evaluator.evaluate
+        return getattr (self, 'evaluate_batch', None)
+    # end def batch_evaluation
+
+    def checkpoint_state (self, pop) :
+        """ The state of the run with the given population as a
+            dictionary for saving as a checkpoint.
+        """
+        state = dict \
+            ( cls          = self.__class__.__name__
+            , generation   = self.generation ()
+            , eval_counter = self.eval_counter
+            , population   = self.get_population_matrix (pop)
+            , evaluations  = np.array
+                ([self.get_evaluation (p, pop) for p in range (self.pop_size)])
+            )
+        rng = getattr (self, 'rng', None)
+        if rng is not None :
+            state ['rng'] = rng.bit_generator.state
+        return state
+    # end def checkpoint_state
+
+    def close (self) :
+        """ Release resources, e.g., worker processes of the evaluator
+        """
+        if self.evaluator is not None :
+            self.evaluator.close ()
+    # end def close
+
+    def endofgen (self) :
+        """ Called by PGApack at the end of each generation. At this
+            point the current population is PGA_NEWPOP, the
+            populations are exchanged after this call.
+        """
+        if self.instrumentation is not None :
+            self.phase_end ('evaluate', self.eval_start)
+            self.eval_start = None
+            self.instrumentation.count \
+                (evaluations = self.eval_counter, ** self.fitness_stats ())
+            if self.fitness_cache is not None :
+                self.instrumentation.count \
+                    ( fitness_cache_hits   = self.fitness_cache.hits
+                    , fitness_cache_misses = self.fitness_cache.misses
+                    )
+            self.instrumentation.end_generation (self.generation ())
+        if  ( self.checkpoint and self.checkpoint_interval
+            and self.generation () % self.checkpoint_interval == 0
+            ) :
+            state = self.checkpoint_state (PGA_NEWPOP)
+            save_checkpoint (self.checkpoint, state)
+    # end def endofgen
+
+    def evaluate_cached (self, m, evaluate_rows, count = True) :
+        """ Evaluate the rows of matrix m, evaluate_rows is called with
+            a list of row numbers and returns their evaluations. With a
+            fitness cache only the genomes not yet seen are evaluated,
+            each of them once. Returns the vector of evaluations, with
+            count the evaluations performed are counted.
+        """
+        cache = self.fitness_cache
+        if cache is None :
+            if count :
+                self.eval_counter += len (m)
+            return evaluate_rows (list (range (len (m))))
+        evals = np.empty (len (m))
+        todo  = {}
+        for row, key in enumerate (genome_keys (m)) :
+            if key in todo :
+                # Duplicate within the batch, evaluated only once
+                todo [key].append (row)
+                cache.hits += 1
+                continue
+            e = cache.get (key)
+            if e is None :
+                todo [key] = [row]
+            else :
+                evals [row] = e
+        if todo :
+            first = [rows [0] for rows in todo.values ()]
+            new   = evaluate_rows (first)
+            for (key, rows), e in zip (todo.items (), new) :
+                e = float (e)
+                cache.put (key, e)
+                evals [rows] = e
+            if count :
+                self.eval_counter += len (todo)
+        return evals
+    # end def evaluate_cached
+
+    def fitness_stats (self, f = None) :
+        """ Best and mean of the evaluations f, by default of the new
+            population
+        """
+        if f is None :
+            get = self.get_evaluation
+            f   = [get (p, PGA_NEWPOP) for p in range (self.pop_size)]
+        f = np.array (f)
+        if not len (f) :
+            return dict (best = None, mean = None)
+        best = f.max () if self.maximize else f.min ()
+        return dict (best = float (best), mean = float (f.mean ()))
+    # end def fitness_stats
+
+    def generation (self) :
+        """ Generation counting from the start of the run, unlike
+            get_iteration this includes the generations performed
+            before resuming from a checkpoint.
+        """
+        return self.generation_offset + self.get_iteration ()
+    # end def generation
+
+    def get_population_matrix (self, pop, indexes = None) :
+        """ Return the individuals with the given indexes (default:
+            the whole population) as one contiguous uint8 matrix with
+            one row per individual. PGApy has no bulk access to the
+            alleles, so this is the only place where we loop over
+            individual alleles when reading a population.
+        """
+        if indexes is None :
+            indexes = range (self.pop_size)
+        get_allele = self.get_allele
+        alleles    = range (len (self))
+        m = np.empty ((len (indexes), len (self)), dtype = np.uint8)
+        for row, p in zip (m, indexes) :
+            row [:] = [get_allele (p, pop, idx) for idx in alleles]
+        return m
+    # end def get_population_matrix
+
+    def pending_matrix (self, pop, indexes) :
+        """ Matrix of the individuals with the given indexes that are
+            still waiting for evaluation.
+        """
+        return self.get_population_matrix (pop, indexes)
+    # end def pending_matrix
+
+    def phase_end (self, phase, start) :
+        """ Record the time since start for the given phase, start
+            is the result of phase_start or of a previous phase_end.
+            Returns the new start time for the next phase.
+        """
+        if start is None :
+            return None
+        t = perf_counter ()
+        self.instrumentation.add_time (phase, t - start)
+        return t
+    # end def phase_end
+
+    def phase_start (self) :
+        """ Start timing a phase, returns None if not instrumented
+            which makes the timing functions a no-op.
+        """
+        if self.instrumentation is None :
+            return None
+        return perf_counter ()
+    # end def phase_start
+
     def post_init (self) :
         pass
     # end def post_init
 
+    def pre_eval (self, pop) :
+        """ Called by PGApack before a population is evaluated.
+            With an evaluator or an evaluate_batch method we evaluate
+            all individuals that are not up to date here, setting the
+            evaluation marks them as up to date and PGApack will not
+            call evaluate. With a fitness cache we also call evaluate
+            here for genomes not in the cache, evaluate is expected
+            to count evaluations itself.
+        """
+        if self.resume_state is not None :
+            self.restore_checkpoint (pop, self.resume_state)
+            self.resume_state = None
+        t = self.phase_start ()
+        evaluate_batch = self.batch_evaluation ()
+        if evaluate_batch is None and self.fitness_cache is None :
+            # Evaluation by PGApack is timed until endofgen
+            self.eval_start = t
+            return
+        indexes = \
+            [ p for p in range (self.pop_size)
+                if not self.get_evaluation_up_to_date (p, pop)
+            ]
+        if indexes :
+            m = self.pending_matrix (pop, indexes)
+            if evaluate_batch is None :
+                def evaluate_rows (rows) :
+                    return [self.evaluate (indexes [r], pop) for r in rows]
+                evals = self.evaluate_cached (m, evaluate_rows, count = False)
+            else :
+                evals = self.evaluate_cached \
+                    (m, lambda rows : evaluate_batch (m [rows]))
+            for p, e in zip (indexes, evals) :
+                self.set_evaluation (p, pop, float (e))
+        self.phase_end ('evaluate', t)
+    # end def pre_eval
+
+    def restore_checkpoint (self, pop, state) :
+        """ Replace the (initial) population with the one from the
+            checkpoint state. Setting the evaluations marks the
+            individuals as evaluated.
+        """
+        m = state ['population']
+        if m.shape != (self.pop_size, len (self)) :
+            raise ValueError \
+                ( "Checkpoint population %s does not match %s"
+                % (m.shape, (self.pop_size, len (self)))
+                )
+        self.set_population_matrix (pop, range (self.pop_size), m)
+        for p, e in enumerate (state ['evaluations']) :
+            self.set_evaluation (p, pop, float (e))
+        self.eval_counter      = state ['eval_counter']
+        self.generation_offset = state ['generation']
+        if 'rng' in state :
+            self.rng.bit_generator.state = state ['rng']
+    # end def restore_checkpoint
+
+    def set_population_matrix (self, pop, indexes, m) :
+        """ Write the rows of matrix m into the individuals with the
+            given indexes, the counterpart of get_population_matrix.
+        """
+        set_allele = self.set_allele
+        for p, row in zip (indexes, m.tolist ()) :
+            for idx, bit in enumerate (row) :
+                set_allele (p, pop, idx, bit)
+    # end def set_population_matrix
+
+    def true_evaluation (self, p, pop) :
+        """ Evaluation of individual p of pop that is not an
+            estimate, the stored evaluation unless a derived class
+            estimates evaluations.
+        """
+        return self.get_evaluation (p, pop)
+    # end def true_evaluation
+
     def print_string (self, file, p, pop) :
         self.__super.print_string (file, p, pop)
         print ("\nEvaluations: ", self.eval_counter, file = file)
+        if self.fitness_cache is not None :
+            print \
+                ( "Fitness cache hits: %d misses: %d entries: %d"
+                % ( self.fitness_cache.hits, self.fitness_cache.misses
+                  , len (self.fitness_cache)
+                  )
+                , file = file
+                )
         file.flush ()
     # end def print_string
 
@@ -99,28 +411,137 @@ class PMBGA (SGA) :
     """ Probabilistic model building GA
         This is a stub, it overrides the mutation to fit the model
         building / sampling into the framework of PGApy.
+        With score_jobs > 0 derived classes can score model candidates
+        in a pool of worker processes, the gene matrix of the parents
+        is shared with the workers (see share_genes).
+        With a surrogate_fraction below 1 only that fraction of the
+        children is evaluated, the others get a fitness estimate
+        inherited from the parents via the structure of the model
+        (see surrogate.py), derived classes define the features of
+        individuals in surrogate_features.
     """
+    score_jobs         = 0
+    surrogate_fraction = 1.0
+    # Number of generations of truly evaluated individuals to fit to
+    surrogate_window   = 3
+
+    def apply_surrogate (self, pop) :
+        """ Set the estimated evaluation for all but a random
+            surrogate_fraction of the pending individuals of pop and
+            those estimated to be at least as good as the best
+            individual used for fitting.
+            The others are kept for computing the error of the
+            surrogate once they are evaluated (see check_surrogate)
+            and for fitting it in the next generation.
+        """
+        indexes = \
+            [ p for p in range (self.pop_size)
+                if not self.get_evaluation_up_to_date (p, pop)
+            ]
+        if not indexes :
+            return
+        m     = self.pending_matrix (pop, indexes)
+        est   = self.surrogate.estimate (self.surrogate_features (m))
+        ntrue = max (1, int (round (self.surrogate_fraction * len (indexes))))
+        true  = np.zeros (len (indexes), dtype = bool)
+        true [self.rng.choice (len (indexes), ntrue, replace = False)] = 1
+        # Estimates at the top of the fitted range are not trusted:
+        # once in the population they would never be corrected.
+        if self.maximize :
+            true |= est >= self.surrogate.max
+        else :
+            true |= est <= self.surrogate.min
+        ntrue = int (true.sum ())
+        for p, e, t in zip (indexes, est, true) :
+            if not t :
+                self.set_evaluation (p, pop, float (e))
+        self.remember_estimates (m [~true])
+        self.surrogate_check = \
+            (np.array (indexes) [true], m [true], est [true])
+        n = len (indexes) - ntrue
+        self.surrogate_count += n
+        if self.instrumentation is not None :
+            self.instrumentation.count (surrogate_estimates = n)
+    # end def apply_surrogate
+
+    def remember_estimates (self, m) :
+        """ Remember the genomes of m as having an estimated evaluation
+            (see true_evaluation). Genomes no longer in the population
+            are forgotten when too many have accumulated.
+        """
+        for key in genome_keys (m) :
+            self.estimated.setdefault (key, None)
+        if len (self.estimated) > 4 * self.pop_size :
+            old  = self.get_population_matrix (PGA_OLDPOP)
+            keep = set (genome_keys (old))
+            keep.update (genome_keys (m))
+            self.estimated = dict \
+                ((k, v) for k, v in self.estimated.items () if k in keep)
+    # end def remember_estimates
+
+    def check_surrogate (self, pop) :
+        """ Compare the estimates of the truly evaluated individuals
+            with their evaluation for the error of the surrogate and
+            remember them for fitting the surrogate. This must happen
+            before replacement (RTR) mixes up the population, so
+            individuals not evaluated by a batch evaluation are
+            evaluated here.
+        """
+        indexes, m, est = self.surrogate_check
+        for p in indexes :
+            if not self.get_evaluation_up_to_date (p, pop) :
+                self.set_evaluation (p, pop, self.evaluate (p, pop))
+        f   = np.array ([self.get_evaluation (p, pop) for p in indexes])
+        err = np.abs (f - est)
+        self.surrogate_error += err.sum ()
+        self.surrogate_nerr  += len (err)
+        self.surrogate_true.append ((m, f))
+        del self.surrogate_true [:-self.surrogate_window]
+        self.surrogate_check  = None
+        if self.instrumentation is not None :
+            self.instrumentation.count (surrogate_error = err.mean ())
+    # end def check_surrogate
 
     def clear_cache (self) :
         pass
     # end def clear_cache
 
+    def close (self) :
+        if self.score_pool is not None :
+            self.score_pool.shutdown ()
+            self.score_pool = None
+        if self.shared is not None :
+            self.shared.close ()
+            self.shared = None
+        self.__super.close ()
+    # end def close
+
     def post_init (self) :
         self.crossover_count = 0
         self.parents  = []
+        self.children = None
         self.last_gen = self.get_iteration ()
         self.file     = sys.stdout
+        # Random generator for vectorized sampling of the model
+        self.rng      = np.random.default_rng (self.random_seed)
+        self.shared     = None
+        self.score_pool = None
+        self.surrogate       = None
+        self.surrogate_check = None
+        self.surrogate_true  = None
+        # Genomes with an estimated evaluation, their true evaluation
+        # once known (see true_evaluation)
+        self.estimated       = {}
+        self.surrogate_count = 0
+        self.surrogate_error = 0.0
+        self.surrogate_nerr  = 0
     # end def post_init
 
     def build_model (self, p_pop) :
-        self.genes = []
-        for p in self.parents :
-            g = []
-            self.genes.append (g)
-            for idx in range (len (self)) :
-                g.append (self.get_allele (p, p_pop, idx))
         if getattr (self.__super, 'build_model', None) :
             self.__super.build_model (p_pop)
+        if self.score_jobs :
+            self.share_genes ()
     # end def build_model
 
     def crossover (self, p1, p2, p_pop, c1, c2, c_pop) :
@@ -138,34 +559,220 @@ class PMBGA (SGA) :
         self.crossover_count += 2
         if self.crossover_count == self.pop_size :
             assert (self.get_iteration () == self.last_gen)
-            print (self.get_iteration ())
-            sys.stdout.flush ()
+            if not self.quiet :
+                print (self.generation ())
+                sys.stdout.flush ()
+            t = self.phase_start ()
+            self.genes = self.get_population_matrix (p_pop, self.parents)
+            t = self.phase_end ('extract', t)
             self.build_model  (p_pop)
+            if self.surrogate_fraction < 1 :
+                self.fit_surrogate (p_pop)
+            t = self.phase_end ('build_model', t)
+            if self.instrumentation is not None :
+                self.instrumentation.count (** self.model_stats ())
             self.sample_model (c1, c2, c_pop)
+            self.phase_end ('sample_model', t)
             self.crossover_count = 0
             self.parents  = []
-            self.children = {}
             self.last_gen += 1
             self.clear_cache ()
     # end def crossover
 
+    def fitness_stats (self) :
+        """ With a surrogate best and mean are computed from true
+            evaluations only: Estimates are replaced by the true
+            evaluation if known (see true_evaluation), otherwise left
+            out. The number left out is reported as estimated.
+        """
+        if not self.estimated :
+            return self.__super.fitness_stats ()
+        get = self.get_evaluation
+        m   = self.get_population_matrix (PGA_NEWPOP)
+        f   = []
+        for p, key in enumerate (genome_keys (m)) :
+            if key in self.estimated :
+                if self.estimated [key] is not None :
+                    f.append (self.estimated [key])
+            else :
+                f.append (get (p, PGA_NEWPOP))
+        stats = self.__super.fitness_stats (f)
+        stats ['estimated'] = self.pop_size - len (f)
+        return stats
+    # end def fitness_stats
+
+    def fit_surrogate (self, p_pop) :
+        """ Fit the surrogate to the truly evaluated individuals of the
+            last surrogate_window generations, i.e., the truly
+            evaluated children and the parents from the fully
+            evaluated initial population. Estimated fitness is never
+            used for fitting, otherwise errors would accumulate.
+        """
+        if self.surrogate_true is None :
+            f = [self.get_evaluation (p, p_pop) for p in self.parents]
+            self.surrogate_true = [(self.genes, np.array (f))]
+        m = np.concatenate ([t [0] for t in self.surrogate_true])
+        f = np.concatenate ([t [1] for t in self.surrogate_true])
+        self.surrogate = Additive_Surrogate (self.surrogate_features (m), f)
+    # end def fit_surrogate
+
+    def checkpoint_state (self, pop) :
+        """ With a surrogate we also save the truly evaluated
+            individuals it is fitted to and which genomes of the
+            population have an estimated evaluation, so a resumed run
+            never fits to estimates.
+        """
+        state = self.__super.checkpoint_state (pop)
+        state ['model'] = self.model_state ()
+        if self.surrogate_true is not None :
+            keys = set (genome_keys (state ['population']))
+            state ['surrogate'] = dict \
+                ( true      = self.surrogate_true
+                , estimated = dict
+                    ((k, v) for k, v in self.estimated.items () if k in keys)
+                , count     = self.surrogate_count
+                , error     = self.surrogate_error
+                , nerr      = self.surrogate_nerr
+                )
+        return state
+    # end def checkpoint_state
+
+    def model_state (self) :
+        """ A picklable description of the last model built for
+            saving in a checkpoint, None if not supported.
+        """
+        return None
+    # end def model_state
+
+    def model_stats (self) :
+        """ Statistics of the last model built as a dictionary,
+            recorded by the instrumentation.
+        """
+        return {}
+    # end def model_stats
+
+    def pending_matrix (self, pop, indexes) :
+        """ The children sampled in this generation are still
+            available as a matrix, no need to read them back.
+        """
+        if pop == PGA_NEWPOP and self.children is not None :
+            return self.children [indexes]
+        return self.__super.pending_matrix (pop, indexes)
+    # end def pending_matrix
+
+    def pre_eval (self, pop) :
+        if self.surrogate is not None and pop == PGA_NEWPOP :
+            self.apply_surrogate (pop)
+        self.__super.pre_eval (pop)
+        self.children = None
+        if self.surrogate_check is not None :
+            self.check_surrogate (pop)
+    # end def pre_eval
+
+    def restore_checkpoint (self, pop, state) :
+        self.__super.restore_checkpoint (pop, state)
+        if state.get ('model') is not None :
+            self.restore_model (state ['model'])
+        if state.get ('surrogate') is not None :
+            s = state ['surrogate']
+            self.surrogate_true  = s ['true']
+            self.estimated       = s ['estimated']
+            self.surrogate_count = s ['count']
+            self.surrogate_error = s ['error']
+            self.surrogate_nerr  = s ['nerr']
+    # end def restore_checkpoint
+
+    def restore_model (self, model) :
+        """ Restore the model saved by model_state
+        """
+        pass
+    # end def restore_model
+
     def print_string (self, file, p, pop) :
         f = self.file
         self.file = file
-        self.print_model ()
-        self.file.flush ()
+        if not self.quiet :
+            self.print_model ()
+            # PGApack prints its report via C stdio, keep the order
+            self.file.flush ()
         self.__super.print_string (file, p, pop)
+        if self.surrogate_count :
+            err = self.surrogate_error / max (1, self.surrogate_nerr)
+            print \
+                ( "Surrogate estimates: %d mean abs error: %g"
+                % (self.surrogate_count, err)
+                , file = file
+                )
         self.file = f
     # end def print_string
 
+    def share_genes (self) :
+        """ Copy the gene matrix to shared memory for the scoring
+            workers, the pool is started on first use.
+        """
+        if self.shared is not None and self.shared.shape != self.genes.shape :
+            self.shared.close ()
+            self.shared = None
+        if self.shared is None :
+            self.shared = Shared_Matrix (self.genes.shape)
+        self.shared.write (self.genes)
+        if self.score_pool is None :
+            self.score_pool = ProcessPoolExecutor (self.score_jobs)
+    # end def share_genes
+
     def sample_model (self, c1, c2, c_pop) :
-        for i in range (self.pop_size) :
-            p = i
-            if i == self.pop_size - 1 :
-                p = c1
-            elif i == self.pop_size - 2 :
-                p = c2
-            self.sample_individual (p, c_pop)
+        """ Sample the whole child population into a matrix and write
+            it back in one go. The last two children go to c1, c2, the
+            rest is written directly into c_pop. PGApack copies c1, c2
+            to the last two positions of c_pop, so the rows of
+            self.children correspond to the individuals in c_pop.
+        """
+        indexes = list (range (self.pop_size))
+        indexes [-2] = c1
+        indexes [-1] = c2
+        self.children = self.sample_population (self.pop_size)
+        self.set_population_matrix (c_pop, indexes, self.children)
     # end def sample_model
 
+    def surrogate_features (self, m) :
+        """ List of integer vectors describing the individuals of m
+            for the surrogate, must be defined in derived classes
+        """
+        raise NotImplementedError ("No surrogate for %s" % self.__class__)
+    # end def surrogate_features
+
+    def true_evaluation (self, p, pop) :
+        """ With a surrogate the stored evaluation may be an estimate:
+            Individuals that got an estimate are evaluated (or looked
+            up in the fitness cache) once, the true evaluation is
+            stored in the population.
+        """
+        evaluate_batch = self.batch_evaluation ()
+        if not self.estimated or evaluate_batch is None :
+            return self.__super.true_evaluation (p, pop)
+        m   = self.get_population_matrix (pop, [p])
+        key = genome_keys (m) [0]
+        if key not in self.estimated :
+            return self.__super.true_evaluation (p, pop)
+        e = self.estimated [key]
+        if e is None :
+            e = self.evaluate_cached (m, lambda rows : evaluate_batch (m))
+            e = float (e [0])
+            self.estimated [key] = e
+        self.set_evaluation (p, pop, e)
+        return e
+    # end def true_evaluation
+
+    def sample_population (self, n) :
+        """ Sample n individuals from the model, returns a matrix with
+            one row per individual. The default samples each row with
+            sample_individual, derived classes may sample all rows at
+            once.
+        """
+        children = np.zeros ((n, len (self)), dtype = np.uint8)
+        for row in children :
+            self.sample_individual (row)
+        return children
+    # end def sample_population
+
 # end def PMBGA
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+import numpy as np
+from rsclib.autosuper  import autosuper
+
+def shared_memory () :
+    """ Imported on first use, multiprocessing.shared_memory needs
+        Python 3.8 or later, only the worker pools depend on it.
+    """
+    from multiprocessing import shared_memory
+    return shared_memory
+# end def shared_memory
+
+class Shared_Matrix (autosuper) :
+    """ A bit (uint8) matrix in shared memory. The creating process
+        writes the matrix, worker processes attach to it by name (see
+        attach below) and get a read-only view without a copy. The
+        creator must close the matrix which also frees the memory.
+    """
+
+    def __init__ (self, shape) :
+        self.shape  = tuple (shape)
+        size        = max (1, int (np.prod (self.shape)))
+        self.shm    = shared_memory ().SharedMemory \
+            (create = True, size = size)
+        self.matrix = np.ndarray \
+            (self.shape, dtype = np.uint8, buffer = self.shm.buf)
+    # end def __init__
+
+    @property
+    def name (self) :
+        return self.shm.name
+    # end def name
+
+    def close (self) :
+        self.matrix = None
+        self.shm.close ()
+        self.shm.unlink ()
+    # end def close
+
+    def write (self, m) :
+        self.matrix [:] = m
+    # end def write
+
+# end class Shared_Matrix
+
+# Attachment of a worker process: name, shared memory, matrix
+_attached = [None, None, None]
+
+def attach (name, shape) :
+    """ Called in a worker process: Return the matrix of the
+        Shared_Matrix with the given name. Only the most recently used
+        matrix stays attached.
+    """
+    if _attached [0] != name :
+        if _attached [1] is not None :
+            _attached [2] = None
+            _attached [1].close ()
+        shm = shared_memory ().SharedMemory (name = name)
+        m   = np.ndarray (shape, dtype = np.uint8, buffer = shm.buf)
+        m.flags.writeable = False
+        _attached [:] = [name, shm, m]
+    return _attached [2]
+# end def attach
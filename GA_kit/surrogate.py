@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+# Copyright (C) 2026 Dr. Ralf Schlatterbeck Open Source Consulting.
+# Reichergasse 131, A-3411 Weidling.
+# Web: http://www.runtux.com Email: office@runtux.com
+# ****************************************************************************
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the
+#    distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ****************************************************************************
+
+
+import numpy as np
+from rsclib.autosuper import autosuper
+
+class Additive_Surrogate (autosuper) :
+    """ Fitness inheritance: An additive estimate of the fitness over
+        the structure of a model. The model describes each individual
+        by a list of features, one integer vector per feature with
+        one entry per individual, e.g., the code of each partition of
+        an ECGA model or the leaf and the bit of each decision tree of
+        an hBOA network. Each value of a feature gets a weight, the
+        weights are fitted by least squares to the deviation of the
+        fitness from the mean. The estimate of an individual is the
+        mean plus the weights of its feature values, clipped to the
+        range of fitness values seen when fitting. Values not seen
+        when fitting contribute nothing.
+    """
+
+    def __init__ (self, features, fitness) :
+        fitness      = np.asarray (fitness, dtype = float)
+        n            = len (fitness)
+        self.mean    = float (fitness.mean ())
+        self.min     = float (fitness.min ())
+        self.max     = float (fitness.max ())
+        self.keys    = []
+        self.offsets = []
+        inverse      = []
+        offset       = 0
+        for ids in features :
+            keys, inv = np.unique (ids, return_inverse = True)
+            self.keys.append    (keys)
+            self.offsets.append (offset)
+            inverse.append      (inv + offset)
+            offset += len (keys)
+        x = np.zeros ((n, offset))
+        for inv in inverse :
+            x [np.arange (n), inv] = 1.0
+        self.weights = np.linalg.lstsq (x, fitness - self.mean, rcond = None)[0]
+    # end def __init__
+
+    def estimate (self, features) :
+        """ Fitness estimates for individuals given by their features
+        """
+        est = np.full (len (features [0]), self.mean)
+        for ids, keys, off in zip (features, self.keys, self.offsets) :
+            pos   = np.minimum (np.searchsorted (keys, ids), len (keys) - 1)
+            found = keys [pos] == ids
+            est  += np.where (found, self.weights [off + pos], 0.0)
+        return np.clip (est, self.min, self.max)
+    # end def estimate
+
+# end class Additive_Surrogate
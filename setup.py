@@ -49,10 +49,14 @@ setup \
     , url              = "https://github.com/schlatterbeck/GA_kit"
     , packages         = ['GA_kit']
     , platforms        = 'Any'
-    , install_requires = ['pgapy', 'rsclib']
+    , install_requires = ['numpy', 'pgapy', 'rsclib']
     , entry_points     = dict
         ( console_scripts =
             [ 'ga-kit-test-deceptive=GA_kit.deceptive:main'
+            , 'ga-kit-benchmark=GA_kit.benchmark:main'
+            , 'ga-kit-popsize=GA_kit.popsize:main'
+            , 'ga-kit-grid=GA_kit.grid:main'
+            , 'ga-kit-islands=GA_kit.island:main'
             ]
         )
     , classifiers      = \